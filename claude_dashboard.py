@@ -7,7 +7,7 @@ Monitor task queue and workers in real-time
 import curses
 import time
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Dict
 import sys
 
@@ -24,7 +24,10 @@ class Dashboard:
             return "-"
         try:
             dt = datetime.fromisoformat(ts)
-            return dt.strftime("%H:%M:%S")
+            if not dt.tzinfo:
+                # The queue stores SQLite CURRENT_TIMESTAMP values (UTC)
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt.astimezone().strftime("%H:%M:%S")
         except:
             return ts[:8] if ts else "-"
 
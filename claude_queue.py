@@ -6,12 +6,106 @@ Manages a SQLite-based task queue for parallel Claude Code execution
 
 import sqlite3
 import json
+import functools
+import hashlib
 import time
-from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterator, Union
 from enum import Enum
 import threading
+import queue
+import weakref
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# orjson is an optional, much faster drop-in for the JSON columns
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Compact separators for the stdlib fallback, matching orjson's output
+_JSON_SEPARATORS = (',', ':')
+
+
+def _json_dumps(obj) -> str:
+    """Encode a value for a JSON TEXT column"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            # orjson is stricter (e.g. non-str dict keys); fall back to stdlib
+            pass
+    return json.dumps(obj, separators=_JSON_SEPARATORS)
+
+
+def _json_dumpb(obj) -> bytes:
+    """Encode a value as UTF-8 JSON bytes for internal-only columns
+
+    Skips the bytes -> str round trip of _json_dumps; SQLite stores the
+    result as a BLOB and _json_loads accepts it as-is.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=_JSON_SEPARATORS).encode()
+
+
+def _json_loads(text):
+    """Decode a JSON TEXT column (or a _json_dumpb BLOB)"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# File contents in task_changes at least this long are stored zlib-compressed
+_COMPRESS_MIN_BYTES = 1024
+_COMPRESSED_TAG = b'Z'
+
+
+# Operations track_file_change() accepts (rollback knows how to undo each)
+_CHANGE_OPERATIONS = ('create', 'modify', 'delete')
+
+
+def _pack_content(content: Optional[str]):
+    """Encode file content for task_changes, compressing large text
+
+    Small content stays plain TEXT. Large content becomes a BLOB of the
+    tag byte followed by zlib data, if that is actually smaller.
+    """
+    if content is None or len(content) < _COMPRESS_MIN_BYTES:
+        return content
+
+    raw = content.encode()
+    packed = _COMPRESSED_TAG + zlib.compress(raw, 6)
+    return packed if len(packed) < len(raw) else content
+
+
+def _unpack_content(value) -> Optional[str]:
+    """Decode a task_changes content column written by _pack_content"""
+    if isinstance(value, bytes):
+        if value[:1] == _COMPRESSED_TAG:
+            return zlib.decompress(value[1:]).decode()
+        return value.decode()
+    return value
+
+
+def _tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """Cursor returning plain tuples, for scalar and count queries"""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor
+
+
+def _rows_to_dicts(cursor: sqlite3.Cursor) -> List[Dict]:
+    """Fetch all rows as dicts, reading the column names once per query"""
+    keys = [column[0] for column in cursor.description]
+    return [dict(zip(keys, row)) for row in cursor.fetchall()]
+
 
 class TaskStatus(Enum):
     PENDING = "pending"
@@ -23,175 +117,760 @@ class TaskStatus(Enum):
     PAUSED = "paused"  # Hit session limit, can be resumed
     RESUMING = "resuming"  # Worker is resuming from checkpoint
 
+
+# Status strings in declaration order, built once so polled stats calls and
+# status validation don't walk the Enum each time.
+_STATUS_VALUES = tuple(status.value for status in TaskStatus)
+
+# Hot-path SQL, defined once so every call passes the identical string
+# object and hits sqlite3's prepared statement cache.
+
+_SQL_INSERT_WORKER_LOG = """
+    INSERT INTO worker_logs (worker_id, task_id, message, level)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_INSERT_TASK = """
+    INSERT INTO tasks (prompt, working_dir, context_files,
+                       expected_outputs, metadata, priority, job_id, parent_task_id,
+                       max_retries, retry_policy)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Readiness predicate shared by the claim and ready-task queries: a task is
+# ready when none of its dependencies is still outstanding
+_SQL_DEPENDENCIES_MET = """
+      NOT EXISTS (
+          SELECT 1
+          FROM task_dependencies td
+          JOIN tasks dep ON td.depends_on_task_id = dep.id
+          WHERE td.task_id = t.id
+            AND dep.status NOT IN ('completed', 'cancelled')
+      )
+"""
+
+# Would task_id -> depends_on_task_id close a cycle? True if task_id is
+# already reachable from depends_on_task_id. UNION (not UNION ALL) drops
+# revisited nodes, so existing cycles terminate.
+_SQL_DEPENDENCY_REACHES = """
+    WITH RECURSIVE reachable(node) AS (
+        SELECT ?
+        UNION
+        SELECT td.depends_on_task_id
+        FROM task_dependencies td
+        JOIN reachable r ON td.task_id = r.node
+    )
+    SELECT 1 FROM reachable WHERE node = ? LIMIT 1
+"""
+
+# Re-adding an existing dependency is a no-op
+_SQL_INSERT_DEPENDENCY = """
+    INSERT OR IGNORE INTO task_dependencies (task_id, depends_on_task_id)
+    VALUES (?, ?)
+"""
+
+# Highest-priority ready task with the given status. With status pinned to
+# one value the (status, priority DESC, created_at) index returns rows in
+# ORDER BY order, so the scan stops at the first ready task instead of
+# sorting every candidate.
+_SQL_NEXT_READY = """
+        SELECT id FROM tasks t
+        WHERE status = '{status}'
+          AND""" + _SQL_DEPENDENCIES_MET + """
+        ORDER BY priority DESC, created_at ASC
+        LIMIT 1
+"""
+
+# The next claimable task: pending tasks go before paused ones
+_SQL_NEXT_CLAIMABLE = """COALESCE(
+        (""" + _SQL_NEXT_READY.format(status='pending') + """),
+        (""" + _SQL_NEXT_READY.format(status='paused') + """)
+    )"""
+
+# Pick the next claimable task and claim it in one statement. The UPDATE
+# runs under SQLite's write lock, so two workers can never claim the same row.
+_SQL_CLAIM_NEXT = """
+    UPDATE tasks
+    SET status = CASE status WHEN 'pending' THEN 'claimed' ELSE 'resuming' END,
+        worker_id = ?,
+        claimed_at = CURRENT_TIMESTAMP
+    WHERE id = """ + _SQL_NEXT_CLAIMABLE + """
+    RETURNING *
+"""
+
+# claim_task() followed by start_task(), as one statement
+_SQL_CLAIM_AND_START_NEXT = """
+    UPDATE tasks
+    SET status = 'in_progress',
+        worker_id = ?,
+        claimed_at = CURRENT_TIMESTAMP,
+        started_at = CURRENT_TIMESTAMP
+    WHERE id = """ + _SQL_NEXT_CLAIMABLE + """
+    RETURNING *
+"""
+
+_SQL_READY_PENDING = """
+    SELECT * FROM tasks t
+    WHERE status = 'pending'
+      AND""" + _SQL_DEPENDENCIES_MET + """
+    ORDER BY priority DESC, created_at ASC
+    LIMIT ?
+"""
+
+_SQL_START_TASK = """
+    UPDATE tasks
+    SET status = 'in_progress', started_at = CURRENT_TIMESTAMP
+    WHERE id = ? AND worker_id = ?
+"""
+
+_SQL_COMPLETE_TASK = """
+    UPDATE tasks
+    SET status = 'completed', completed_at = CURRENT_TIMESTAMP, result = ?
+    WHERE id = ? AND worker_id = ?
+    RETURNING job_id, metadata
+"""
+
+# Opt-in result cache (add_tasks with use_result_cache): tasks carry their
+# key in metadata, complete_task stores the result, and only the most
+# recently used entries are kept
+_SQL_CACHE_RESULT = """
+    INSERT INTO result_cache (key, result) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET
+        result = excluded.result,
+        used_at = CURRENT_TIMESTAMP
+"""
+
+_SQL_PRUNE_RESULT_CACHE = """
+    DELETE FROM result_cache
+    WHERE key IN (
+        SELECT key FROM result_cache
+        ORDER BY used_at DESC
+        LIMIT -1 OFFSET ?
+    )
+"""
+
+_SQL_COMPLETE_FROM_CACHE = """
+    UPDATE tasks
+    SET status = 'completed', completed_at = CURRENT_TIMESTAMP, result = ?
+    WHERE id = ?
+"""
+
+_SQL_WORKER_HEARTBEAT = """
+    UPDATE workers
+    SET last_heartbeat = CURRENT_TIMESTAMP, status = ?, current_task_id = ?
+    WHERE worker_id = ?
+"""
+
+# Upsert rather than INSERT OR REPLACE: repeated checkpoints update the row
+# in place (no delete + reinsert) and keep the original created_at
+_SQL_SAVE_CHECKPOINT = """
+    INSERT INTO checkpoints
+    (task_id, checkpoint_data, files_created, files_modified,
+     last_step, completion_percentage, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(task_id) DO UPDATE SET
+        checkpoint_data = excluded.checkpoint_data,
+        files_created = excluded.files_created,
+        files_modified = excluded.files_modified,
+        last_step = excluded.last_step,
+        completion_percentage = excluded.completion_percentage,
+        updated_at = excluded.updated_at
+"""
+
+_SQL_INSERT_TASK_CHANGE = """
+    INSERT INTO task_changes
+    (task_id, operation, file_path_id, before_content, after_content)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+# Fail a task, or put it straight back to pending when auto-retry is on and
+# it has retries left, in one statement. SET expressions all see the row's
+# pre-update values, so the retry test is the same in every column.
+_SQL_FAIL_TASK = """
+    UPDATE tasks
+    SET status = CASE WHEN :retry AND retry_count < max_retries
+                      THEN 'pending' ELSE 'failed' END,
+        prompt = CASE WHEN :retry AND retry_count < max_retries
+                      THEN :prefix || prompt ELSE prompt END,
+        worker_id = CASE WHEN :retry AND retry_count < max_retries
+                         THEN NULL ELSE worker_id END,
+        claimed_at = CASE WHEN :retry AND retry_count < max_retries
+                          THEN NULL ELSE claimed_at END,
+        started_at = CASE WHEN :retry AND retry_count < max_retries
+                          THEN NULL ELSE started_at END,
+        completed_at = CASE WHEN :retry AND retry_count < max_retries
+                            THEN completed_at ELSE CURRENT_TIMESTAMP END,
+        error = CASE WHEN :retry AND retry_count < max_retries
+                     THEN NULL ELSE :error END,
+        retry_count = retry_count + (:retry AND retry_count < max_retries),
+        last_error = :error
+    WHERE id = :task_id AND worker_id = :worker_id
+    RETURNING status, job_id
+"""
+
+_RETRY_PROMPT_TEMPLATE = (
+    "Previous attempt failed with error:\n"
+    "{error}\n"
+    "\n"
+    "Please fix the issue and complete the task:\n"
+    "{prompt}"
+)
+
+# The template split around its placeholders, for building retry prompts
+# in SQL (the prompt always comes last)
+_RETRY_BEFORE_ERROR, _RETRY_BEFORE_PROMPT = (
+    _RETRY_PROMPT_TEMPLATE[:-len("{prompt}")].split("{error}")
+)
+
+# Reset every retryable failed task in one statement; {job_filter} is empty
+# or "AND job_id = :job_id". Tasks without a last_error keep their prompt,
+# as in _build_retry_prompt().
+_SQL_RETRY_FAILED_TASKS = """
+    UPDATE tasks
+    SET status = 'pending',
+        prompt = CASE WHEN COALESCE(last_error, '') = '' THEN prompt
+                      ELSE :before_error || last_error || :before_prompt || prompt END,
+        worker_id = NULL,
+        claimed_at = NULL,
+        started_at = NULL,
+        error = NULL,
+        retry_count = retry_count + 1,
+        last_error = COALESCE(NULLIF(last_error, ''), 'Unknown error')
+    WHERE status = 'failed'
+      {job_filter}
+      AND retry_count < max_retries
+    RETURNING id, priority, created_at
+"""
+
+_SQL_ACTIVE_PROGRESS = """
+    SELECT w.worker_id, w.status, w.current_task_id,
+           t.prompt as current_task_prompt,
+           (SELECT message FROM worker_logs
+            WHERE worker_id = w.worker_id
+            ORDER BY timestamp DESC LIMIT 1) as last_message
+    FROM workers w
+    LEFT JOIN tasks t ON w.current_task_id = t.id
+    WHERE w.status = 'active'
+    ORDER BY w.last_heartbeat DESC
+"""
+
+# Same shape as get_stats(), built as a JSON string inside SQLite. The status
+# list comes from _STATUS_VALUES so statuses with no tasks still report 0.
+_SQL_STATS_JSON = """
+    WITH statuses(status) AS (VALUES """ + ", ".join(
+        f"('{status}')" for status in _STATUS_VALUES
+    ) + """),
+    counts AS (SELECT status, COUNT(*) AS n FROM tasks GROUP BY status)
+    SELECT json_set(
+        (SELECT json_group_object(s.status, COALESCE(c.n, 0))
+         FROM statuses s LEFT JOIN counts c ON c.status = s.status),
+        '$.active_workers', (SELECT COALESCE(SUM(status = 'active'), 0) FROM workers),
+        '$.total_workers', (SELECT COUNT(*) FROM workers)
+    )
+"""
+
+
 class TaskQueue:
-    def __init__(self, db_path: str = "claude_tasks.db"):
+    # Max (task_id, field) entries kept in the checkpoint JSON cache
+    _JSON_CACHE_SIZE = 1024
+    # Max interned file path IDs kept in memory
+    _PATH_ID_CACHE_SIZE = 10000
+    # Background file-change writer: queue bound, rows per batch, and how
+    # long (seconds) to wait for more rows before writing a batch
+    _CHANGE_QUEUE_SIZE = 10000
+    _CHANGE_BATCH_SIZE = 256
+    _CHANGE_BATCH_WAIT = 0.05
+    # Seconds between PRAGMA data_version checks in wait_for_change()
+    _DATA_VERSION_INTERVAL = 0.1
+    # Max entries kept in the opt-in result cache
+    _RESULT_CACHE_SIZE = 1000
+
+    def __init__(self, db_path: str = "claude_tasks.db", read_pool_size: int = 4):
         self.db_path = db_path
-        self.local = threading.local()
+
+        # One writer connection shared by all threads (SQLite serializes
+        # writers anyway) plus a small pool of reader connections.
+        self._write_conn = self._connect()
+        self._write_lock = threading.RLock()
+        # Open _writer() transactions on the owning thread (under _write_lock)
+        self._write_depth = 0
+        self._read_pool = queue.LifoQueue(maxsize=read_pool_size)
+        self._read_pool_size = read_pool_size
+        self._read_conns_opened = 0
+        self._pool_lock = threading.Lock()
+
+        # (task_id, field) -> (values, json) for checkpoint file lists, so
+        # repeated checkpoints with unchanged lists skip re-encoding.
+        # Only touched under the writer lock.
+        self._json_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+        # file_paths rows are never deleted, so path -> id can be cached
+        # for the life of the queue. Only touched under the writer lock.
+        self._path_ids: Dict[str, int] = {}
+
+        # track_file_change() rows waiting for the background writer
+        self._change_queue: "queue.Queue[tuple]" = queue.Queue(maxsize=self._CHANGE_QUEUE_SIZE)
+        self._change_thread: Optional[threading.Thread] = None
+        self._change_thread_lock = threading.Lock()
+        # First error the background writer hit; raised by flush_changes()
+        self._change_error: Optional[BaseException] = None
+
+        # job_id -> Condition notified when one of the job's tasks finishes;
+        # weak so an entry lives only while some wait_for_change() holds it
+        self._job_conds: "weakref.WeakValueDictionary[str, threading.Condition]" = \
+            weakref.WeakValueDictionary()
+        self._job_conds_lock = threading.Lock()
+
+        # Dedicated connection for PRAGMA data_version, which only reports
+        # commits made by *other* connections since its own last read
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._version_lock = threading.Lock()
+
         self._init_db()
 
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a new database connection usable from any thread"""
+        # isolation_level=None: no implicit BEGINs, _writer() manages
+        # transactions explicitly
+        conn = sqlite3.connect(
+            self.db_path, timeout=30.0, check_same_thread=False, cached_statements=512,
+            isolation_level=None
+        )
+        conn.row_factory = sqlite3.Row
+
+        # Per-connection tuning; journal_mode=WAL is persistent and set in _init_db
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -65536")
+        conn.execute("PRAGMA mmap_size = 268435456")
+
+        if read_only:
+            # Pool connections must never write; fail loudly if one tries
+            conn.execute("PRAGMA query_only = 1")
+        else:
+            # Commits on the writer checkpoint the WAL back into the database
+            # once it passes this many pages, capping its growth
+            conn.execute("PRAGMA wal_autocheckpoint = 1000")
+        return conn
+
     def _get_conn(self):
-        """Get thread-local database connection"""
-        if not hasattr(self.local, 'conn'):
-            self.local.conn = sqlite3.connect(self.db_path, timeout=30.0)
-            self.local.conn.row_factory = sqlite3.Row
-        return self.local.conn
+        """Get the shared writer connection"""
+        return self._write_conn
+
+    def close(self):
+        """
+        Flush queued file changes and close the queue's connections
+
+        The queue must not be used afterwards. Reader connections that are
+        borrowed at the time of the call are closed when garbage collected.
+        """
+        self.flush_changes()
+
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+        with self._version_lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+
+        with self._write_lock:
+            self._write_conn.close()
+
+    @contextmanager
+    def _writer(self, transaction: bool = True):
+        """
+        Borrow the writer connection, serializing writes across threads
+
+        The block runs in a BEGIN IMMEDIATE transaction, so the write lock is
+        taken up front rather than upgraded mid-transaction, and is committed
+        on exit or rolled back if the block (or the COMMIT) raises. Nested
+        borrows on the same thread join the outer transaction. Pass
+        transaction=False for statements that cannot run inside one
+        (journal_mode, wal_checkpoint).
+        """
+        with self._write_lock:
+            conn = self._write_conn
+            # Nesting is tracked here rather than via conn.in_transaction, so
+            # a transaction a caller opened through get_connection() is never
+            # silently joined (BEGIN IMMEDIATE raises instead)
+            if not transaction or self._write_depth:
+                yield conn
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            self._write_depth += 1
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                # SQLite may already have rolled back (e.g. after an I/O
+                # error); a second ROLLBACK would hide the original error
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                # Paths interned in the rolled back transaction are gone
+                self._path_ids.clear()
+                raise
+            finally:
+                self._write_depth -= 1
+
+    @contextmanager
+    def _reader(self):
+        """Borrow a reader connection from the pool"""
+        if self.db_path == ':memory:':
+            # Every connection to :memory: is a separate database
+            with self._writer() as conn:
+                yield conn
+            return
+
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                can_open = self._read_conns_opened < self._read_pool_size
+                if can_open:
+                    self._read_conns_opened += 1
+            conn = self._connect(read_only=True) if can_open else self._read_pool.get()
+
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
 
     def _init_db(self):
         """Initialize database schema"""
-        conn = self._get_conn()
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                prompt TEXT NOT NULL,
-                working_dir TEXT,
-                context_files TEXT,  -- JSON array of files to read
-                expected_outputs TEXT,  -- JSON array of expected output files
-                metadata TEXT,  -- JSON for additional data
-                status TEXT NOT NULL DEFAULT 'pending',
-                worker_id TEXT,
-                job_id TEXT,  -- Group related tasks together
-                parent_task_id INTEGER,  -- For hierarchical tasks
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                claimed_at TIMESTAMP,
-                started_at TIMESTAMP,
-                completed_at TIMESTAMP,
-                result TEXT,  -- JSON with results/outputs
-                error TEXT,
-                priority INTEGER DEFAULT 0,
-                retry_count INTEGER DEFAULT 0,  -- Number of retry attempts
-                max_retries INTEGER DEFAULT 0,  -- Maximum allowed retries
-                last_error TEXT,  -- Error from last failed attempt
-                retry_policy TEXT,  -- JSON with retry configuration
-                FOREIGN KEY (parent_task_id) REFERENCES tasks(id)
-            )
-        """)
+        with self._writer(transaction=False) as conn:
+            # Let maintenance() return pages freed by log pruning to the OS.
+            # Only takes effect on a new database (before any table exists).
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+            # WAL lets the reader pool run alongside the writer
+            if self.db_path != ':memory:':
+                mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+                if mode != 'wal':
+                    # e.g. network filesystems without shared memory support
+                    print(f"[TaskQueue] WARNING: WAL not available for {self.db_path}, "
+                          f"using journal_mode={mode}; readers will block writers")
+
+        # The whole schema, including migrations, is created in one transaction
+        with self._writer() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    prompt TEXT NOT NULL,
+                    working_dir TEXT,
+                    context_files TEXT,  -- JSON array of files to read
+                    expected_outputs TEXT,  -- JSON array of expected output files
+                    metadata TEXT,  -- JSON for additional data
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker_id TEXT,
+                    job_id TEXT,  -- Group related tasks together
+                    parent_task_id INTEGER,  -- For hierarchical tasks
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    claimed_at TIMESTAMP,
+                    started_at TIMESTAMP,
+                    completed_at TIMESTAMP,
+                    result TEXT,  -- JSON with results/outputs
+                    error TEXT,
+                    priority INTEGER DEFAULT 0,
+                    retry_count INTEGER DEFAULT 0,  -- Number of retry attempts
+                    max_retries INTEGER DEFAULT 0,  -- Maximum allowed retries
+                    last_error TEXT,  -- Error from last failed attempt
+                    retry_policy TEXT,  -- JSON with retry configuration
+                    FOREIGN KEY (parent_task_id) REFERENCES tasks(id)
+                )
+            """)
 
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_status
-            ON tasks(status, priority DESC, created_at)
-        """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_status
+                ON tasks(status, priority DESC, created_at)
+            """)
 
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS workers (
-                worker_id TEXT PRIMARY KEY,
-                status TEXT NOT NULL,
-                current_task_id INTEGER,
-                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_heartbeat TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                stats TEXT  -- JSON with worker statistics
-            )
-        """)
+            # The claim's separate status = 'pending' / 'paused' picks seek
+            # idx_status directly; the old partial claim index was never read
+            conn.execute("DROP INDEX IF EXISTS idx_claim")
 
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS jobs (
-                job_id TEXT PRIMARY KEY,
-                description TEXT,
-                orchestrator_id TEXT,
-                status TEXT NOT NULL DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                metadata TEXT  -- JSON for job-level data
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_parent
+                ON tasks(parent_task_id)
+            """)
+
+            # Only the failed tasks that can still be retried
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_retryable
+                ON tasks(job_id, priority DESC, created_at)
+                WHERE status = 'failed' AND retry_count < max_retries
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS workers (
+                    worker_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    current_task_id INTEGER,
+                    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_heartbeat TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    stats TEXT  -- JSON with worker statistics
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    description TEXT,
+                    orchestrator_id TEXT,
+                    status TEXT NOT NULL DEFAULT 'active',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    completed_at TIMESTAMP,
+                    metadata TEXT  -- JSON for job-level data
+                )
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_job_tasks
+                ON tasks(job_id, status)
+            """)
+
+            # Checkpoints table for pause/resume functionality
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    task_id INTEGER PRIMARY KEY,
+                    checkpoint_data TEXT NOT NULL,  -- JSON blob with progress data
+                    files_created TEXT,  -- JSON array of files created
+                    files_modified TEXT,  -- JSON array of files modified
+                    last_step TEXT,  -- Description of last completed step
+                    completion_percentage INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (task_id) REFERENCES tasks(id)
+                )
+            """)
+
+            # Task changes table for rollback support
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS file_paths (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS task_changes (
+                    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_id INTEGER NOT NULL,
+                    operation TEXT NOT NULL,  -- 'create', 'modify', 'delete'
+                    file_path_id INTEGER NOT NULL REFERENCES file_paths(id),
+                    before_content TEXT,  -- For rollback (NULL for create)
+                    after_content TEXT,  -- For rollback (NULL for delete)
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (task_id) REFERENCES tasks(id)
+                )
+            """)
+
+            self._migrate_task_change_paths(conn)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_task_changes
+                ON task_changes(task_id, timestamp)
+            """)
+
+            # Shared context for worker coordination
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS shared_context (
+                    context_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT,  -- NULL for global context
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(job_id, key)
+                )
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_shared_context_job
+                ON shared_context(job_id)
+            """)
+
+            # Worker logs for progress visibility
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS worker_logs (
+                    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    worker_id TEXT NOT NULL,
+                    task_id INTEGER,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    message TEXT NOT NULL,
+                    level TEXT DEFAULT 'info',
+                    FOREIGN KEY (task_id) REFERENCES tasks(id)
+                )
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_worker_logs_task
+                ON worker_logs(task_id, timestamp)
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_worker_logs_worker
+                ON worker_logs(worker_id, timestamp DESC)
+            """)
+
+            # Task dependencies
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS task_dependencies (
+                    task_id INTEGER NOT NULL,
+                    depends_on_task_id INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (task_id, depends_on_task_id),
+                    FOREIGN KEY (task_id) REFERENCES tasks(id),
+                    FOREIGN KEY (depends_on_task_id) REFERENCES tasks(id)
+                )
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_task_dependencies
+                ON task_dependencies(task_id)
+            """)
+
+            # Reverse lookup: which tasks are waiting on a given task
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_task_dependencies_on
+                ON task_dependencies(depends_on_task_id)
+            """)
+
+            # Results of completed tasks submitted with use_result_cache,
+            # keyed by result_cache_key()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,  -- JSON, as stored in tasks.result
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_result_cache_used
+                ON result_cache(used_at)
+            """)
+
+            self._init_job_status_counts(conn)
+
+            # Give the query planner statistics for the indexes above. Only needed
+            # once per database; maintenance() keeps them fresh afterwards.
+            cursor = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
             )
-        """)
+            if cursor.fetchone() is None:
+                conn.execute("ANALYZE")
 
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_job_tasks
-            ON tasks(job_id, status)
-        """)
+    def _migrate_task_change_paths(self, conn: sqlite3.Connection):
+        """
+        Move task_changes from inline file_path text to file_paths IDs
+
+        Databases created before paths were interned still have a
+        task_changes.file_path column; rebuild the table in the new shape.
+        Runs inside _init_db()'s transaction.
+        """
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(task_changes)")]
+        if 'file_path' not in columns:
+            return
 
-        # Checkpoints table for pause/resume functionality
         conn.execute("""
-            CREATE TABLE IF NOT EXISTS checkpoints (
-                task_id INTEGER PRIMARY KEY,
-                checkpoint_data TEXT NOT NULL,  -- JSON blob with progress data
-                files_created TEXT,  -- JSON array of files created
-                files_modified TEXT,  -- JSON array of files modified
-                last_step TEXT,  -- Description of last completed step
-                completion_percentage INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (task_id) REFERENCES tasks(id)
-            )
+            INSERT OR IGNORE INTO file_paths (path)
+            SELECT DISTINCT file_path FROM task_changes
         """)
-
-        # Task changes table for rollback support
         conn.execute("""
-            CREATE TABLE IF NOT EXISTS task_changes (
+            CREATE TABLE task_changes_new (
                 change_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 task_id INTEGER NOT NULL,
                 operation TEXT NOT NULL,  -- 'create', 'modify', 'delete'
-                file_path TEXT NOT NULL,
+                file_path_id INTEGER NOT NULL REFERENCES file_paths(id),
                 before_content TEXT,  -- For rollback (NULL for create)
                 after_content TEXT,  -- For rollback (NULL for delete)
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (task_id) REFERENCES tasks(id)
             )
         """)
-
         conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_task_changes
-            ON task_changes(task_id, timestamp)
-        """)
-
-        # Shared context for worker coordination
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS shared_context (
-                context_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_id TEXT,  -- NULL for global context
-                key TEXT NOT NULL,
-                value TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(job_id, key)
-            )
+            INSERT INTO task_changes_new
+            (change_id, task_id, operation, file_path_id,
+             before_content, after_content, timestamp)
+            SELECT tc.change_id, tc.task_id, tc.operation, fp.id,
+                   tc.before_content, tc.after_content, tc.timestamp
+            FROM task_changes tc
+            JOIN file_paths fp ON fp.path = tc.file_path
         """)
+        conn.execute("DROP TABLE task_changes")
+        conn.execute("ALTER TABLE task_changes_new RENAME TO task_changes")
 
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_shared_context_job
-            ON shared_context(job_id)
-        """)
+    def _init_job_status_counts(self, conn: sqlite3.Connection):
+        """
+        Create the per-job status count rollup and the triggers that maintain it
 
-        # Worker logs for progress visibility
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS worker_logs (
-                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                worker_id TEXT NOT NULL,
-                task_id INTEGER,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                message TEXT NOT NULL,
-                level TEXT DEFAULT 'info',
-                FOREIGN KEY (task_id) REFERENCES tasks(id)
-            )
-        """)
+        get_job_stats() reads this table instead of counting tasks. When the
+        table is first created it is backfilled from tasks in the same
+        transaction as the triggers, so no concurrent write is missed.
+        """
+        exists = conn.execute("""
+            SELECT 1 FROM sqlite_master
+            WHERE type = 'table' AND name = 'job_status_counts'
+        """).fetchone()
 
         conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_worker_logs_task
-            ON worker_logs(task_id, timestamp)
+            CREATE TABLE IF NOT EXISTS job_status_counts (
+                job_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (job_id, status)
+            ) WITHOUT ROWID
         """)
 
         conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_worker_logs_worker
-            ON worker_logs(worker_id, timestamp DESC)
+            CREATE TRIGGER IF NOT EXISTS trg_job_counts_insert
+            AFTER INSERT ON tasks
+            WHEN NEW.job_id IS NOT NULL
+            BEGIN
+                INSERT INTO job_status_counts (job_id, status, count)
+                VALUES (NEW.job_id, NEW.status, 1)
+                ON CONFLICT(job_id, status) DO UPDATE SET count = count + 1;
+            END
         """)
 
-        # Task dependencies
         conn.execute("""
-            CREATE TABLE IF NOT EXISTS task_dependencies (
-                task_id INTEGER NOT NULL,
-                depends_on_task_id INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (task_id, depends_on_task_id),
-                FOREIGN KEY (task_id) REFERENCES tasks(id),
-                FOREIGN KEY (depends_on_task_id) REFERENCES tasks(id)
-            )
+            CREATE TRIGGER IF NOT EXISTS trg_job_counts_delete
+            AFTER DELETE ON tasks
+            WHEN OLD.job_id IS NOT NULL
+            BEGIN
+                UPDATE job_status_counts SET count = count - 1
+                WHERE job_id = OLD.job_id AND status = OLD.status;
+            END
         """)
 
         conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_task_dependencies
-            ON task_dependencies(task_id)
+            CREATE TRIGGER IF NOT EXISTS trg_job_counts_update
+            AFTER UPDATE OF status, job_id ON tasks
+            WHEN OLD.status IS NOT NEW.status OR OLD.job_id IS NOT NEW.job_id
+            BEGIN
+                UPDATE job_status_counts SET count = count - 1
+                WHERE job_id = OLD.job_id AND status = OLD.status;
+
+                INSERT INTO job_status_counts (job_id, status, count)
+                SELECT NEW.job_id, NEW.status, 1
+                WHERE NEW.job_id IS NOT NULL
+                ON CONFLICT(job_id, status) DO UPDATE SET count = count + 1;
+            END
         """)
 
-        conn.commit()
+        if not exists:
+            conn.execute("""
+                INSERT INTO job_status_counts (job_id, status, count)
+                SELECT job_id, status, COUNT(*) FROM tasks
+                WHERE job_id IS NOT NULL
+                GROUP BY job_id, status
+            """)
 
     # Public API Methods
 
@@ -200,7 +879,7 @@ class TaskQueue:
         Get a database connection for custom queries
 
         Returns:
-            sqlite3.Connection: Thread-local database connection
+            sqlite3.Connection: The queue's shared writer connection
 
         Example:
             ```python
@@ -211,8 +890,11 @@ class TaskQueue:
             ```
 
         Note:
-            The connection is thread-local and managed internally.
-            It's safe to use across multiple calls in the same thread.
+            The connection is shared by all threads using this queue and
+            managed internally. It is in autocommit mode; wrap multi-statement
+            writes in an explicit BEGIN IMMEDIATE ... COMMIT, and don't call
+            other queue methods while that transaction is open (they raise
+            rather than join it).
         """
         return self._get_conn()
 
@@ -233,12 +915,32 @@ class TaskQueue:
             queue.log_worker_progress("worker_1", "Compilation passed", task_id=123)
             ```
         """
-        conn = self._get_conn()
-        conn.execute("""
-            INSERT INTO worker_logs (worker_id, task_id, message, level)
-            VALUES (?, ?, ?, ?)
-        """, (worker_id, task_id, message, level))
-        conn.commit()
+        with self._writer() as conn:
+            conn.execute(_SQL_INSERT_WORKER_LOG, (worker_id, task_id, message, level))
+
+    def log_worker_progress_bulk(self, logs: List[Dict]):
+        """
+        Log several worker progress messages in a single transaction
+
+        Args:
+            logs: List of dicts with worker_id, message and optional
+                task_id / level (default 'info')
+
+        Example:
+            ```python
+            queue.log_worker_progress_bulk([
+                {"worker_id": "worker_1", "message": "Claimed task", "task_id": 123},
+                {"worker_id": "worker_1", "message": "Build failed",
+                 "task_id": 123, "level": "error"},
+            ])
+            ```
+        """
+        rows = [
+            (log['worker_id'], log.get('task_id'), log['message'], log.get('level', 'info'))
+            for log in logs
+        ]
+        with self._writer() as conn:
+            conn.executemany(_SQL_INSERT_WORKER_LOG, rows)
 
     def get_worker_logs(self, worker_id: Optional[str] = None,
                        task_id: Optional[int] = None,
@@ -267,140 +969,38 @@ class TaskQueue:
             logs = queue.get_worker_logs(limit=50)
             ```
         """
-        conn = self._get_conn()
-
-        query = "SELECT * FROM worker_logs WHERE 1=1"
-        params = []
-
-        if worker_id:
-            query += " AND worker_id = ?"
-            params.append(worker_id)
-
-        if task_id:
-            query += " AND task_id = ?"
-            params.append(task_id)
-
-        query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
-
-        cursor = conn.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
-
-    def get_active_progress(self) -> List[Dict]:
-        """
-        Get current progress across all active workers
-
-        Returns:
-            List of dictionaries with worker status and current task info:
-            - worker_id: Worker identifier
-            - status: Worker status ('active', 'idle')
-            - current_task_id: Current task ID (if any)
-            - task_prompt: Current task prompt (if any)
-            - task_status: Current task status
-            - recent_log: Most recent log message
-
-        Example:
-            ```python
-            progress = queue.get_active_progress()
-            for worker in progress:
-                if worker['current_task_id']:
-                    print(f"{worker['worker_id']}: {worker['task_prompt'][:50]}...")
-                else:
-                    print(f"{worker['worker_id']}: Idle")
-            ```
-        """
-        conn = self._get_conn()
-
-        cursor = conn.execute("""
-            SELECT
-                w.worker_id,
-                w.status,
-                w.current_task_id,
-                t.prompt as task_prompt,
-                t.status as task_status,
-                (
-                    SELECT message
-                    FROM worker_logs
-                    WHERE worker_id = w.worker_id
-                    ORDER BY timestamp DESC
-                    LIMIT 1
-                ) as recent_log
-            FROM workers w
-            LEFT JOIN tasks t ON w.current_task_id = t.id
-            ORDER BY w.worker_id
-        """)
-
-        return [dict(row) for row in cursor.fetchall()]
-
-    def get_job_progress(self, job_id: str) -> Dict:
-        """
-        Get detailed progress information for a specific job
-
-        Args:
-            job_id: Job identifier
-
-        Returns:
-            Dictionary with comprehensive job progress:
-            - job_info: Job metadata
-            - stats: Task statistics (pending, in_progress, completed, failed)
-            - active_tasks: List of currently executing tasks with worker info
-            - recent_logs: Recent log messages for this job's tasks
-
-        Example:
-            ```python
-            progress = queue.get_job_progress("job_abc123")
-            print(f"Progress: {progress['stats']['completed']}/{progress['stats']['total']}")
-            for task in progress['active_tasks']:
-                print(f"  {task['worker_id']}: {task['prompt'][:50]}...")
-            ```
-        """
-        conn = self._get_conn()
-
-        # Get job info
-        job = self.get_job(job_id)
-
-        # Get stats
-        stats = self.get_job_stats(job_id)
-
-        # Get active tasks with worker info
-        cursor = conn.execute("""
-            SELECT
-                t.id,
-                t.prompt,
-                t.status,
-                t.worker_id,
-                t.started_at,
-                w.last_heartbeat
-            FROM tasks t
-            LEFT JOIN workers w ON t.worker_id = w.worker_id
-            WHERE t.job_id = ? AND t.status IN ('claimed', 'in_progress')
-            ORDER BY t.started_at
-        """, (job_id,))
-        active_tasks = [dict(row) for row in cursor.fetchall()]
-
-        # Get recent logs for this job's tasks
-        cursor = conn.execute("""
-            SELECT
-                wl.worker_id,
-                wl.task_id,
-                wl.timestamp,
-                wl.message,
-                wl.level,
-                t.prompt as task_prompt
-            FROM worker_logs wl
-            JOIN tasks t ON wl.task_id = t.id
-            WHERE t.job_id = ?
-            ORDER BY wl.timestamp DESC
-            LIMIT 50
-        """, (job_id,))
-        recent_logs = [dict(row) for row in cursor.fetchall()]
-
-        return {
-            'job_info': job,
-            'stats': stats,
-            'active_tasks': active_tasks,
-            'recent_logs': recent_logs
-        }
+        with self._reader() as conn:
+
+            if worker_id and task_id:
+                query = """
+                    SELECT * FROM worker_logs
+                    WHERE worker_id = ? AND task_id = ?
+                    ORDER BY timestamp DESC LIMIT ?
+                """
+                params = (worker_id, task_id, limit)
+            elif worker_id:
+                query = """
+                    SELECT * FROM worker_logs
+                    WHERE worker_id = ?
+                    ORDER BY timestamp DESC LIMIT ?
+                """
+                params = (worker_id, limit)
+            elif task_id:
+                query = """
+                    SELECT * FROM worker_logs
+                    WHERE task_id = ?
+                    ORDER BY timestamp DESC LIMIT ?
+                """
+                params = (task_id, limit)
+            else:
+                query = """
+                    SELECT * FROM worker_logs
+                    ORDER BY timestamp DESC LIMIT ?
+                """
+                params = (limit,)
+
+            cursor = conn.execute(query, params)
+            return _rows_to_dicts(cursor)
 
     def add_task(self, prompt: str, working_dir: Optional[str] = None,
                  context_files: Optional[List[str]] = None,
@@ -429,26 +1029,170 @@ class TaskQueue:
         Returns:
             Task ID
         """
-        conn = self._get_conn()
-        cursor = conn.execute("""
-            INSERT INTO tasks (prompt, working_dir, context_files,
-                             expected_outputs, metadata, priority, job_id, parent_task_id,
-                             max_retries, retry_policy)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        with self._writer() as conn:
+            cursor = conn.execute(_SQL_INSERT_TASK, self._task_params(
+                prompt, working_dir, context_files, expected_outputs, metadata,
+                priority, job_id, parent_task_id, max_retries, retry_policy
+            ))
+            return cursor.lastrowid
+
+    def add_tasks(self, tasks: List[Dict]) -> List[int]:
+        """
+        Add several tasks in a single transaction
+
+        A task's depends_on edges are added in the same transaction, so no
+        worker can claim it before they exist.
+
+        A task with use_result_cache set is completed on the spot with the
+        stored result of an identical earlier task (see result_cache_key())
+        instead of going to a worker, provided its dependencies are already
+        met. Only use it for tasks whose outcome doesn't depend on the state
+        of the working directory. On a miss, the result is cached when the
+        task completes.
+
+        Args:
+            tasks: List of dicts with the same keys as add_task's arguments
+                (prompt is required), plus optional depends_on (list of
+                existing task IDs) and use_result_cache
+
+        Returns:
+            Task IDs, in the same order as tasks
+
+        Raises:
+            ValueError: If a dependency would create a cycle (nothing is added)
+
+        Example:
+            ```python
+            task_ids = queue.add_tasks([
+                {"prompt": "Create Button component", "priority": 5},
+                {"prompt": "Create Input component", "job_id": "job_abc123"},
+            ])
+            ```
+        """
+        if not tasks:
+            return []
+
+        rows = []
+        cache_keys = []
+        for t in tasks:
+            metadata = t.get('metadata')
+            cache_key = None
+            if t.get('use_result_cache'):
+                cache_key = self.result_cache_key(t)
+                metadata = {**(metadata or {}), 'result_cache_key': cache_key}
+            cache_keys.append(cache_key)
+
+            rows.append(self._task_params(
+                t['prompt'],
+                t.get('working_dir'),
+                t.get('context_files'),
+                t.get('expected_outputs'),
+                metadata,
+                t.get('priority', 0),
+                t.get('job_id'),
+                t.get('parent_task_id'),
+                t.get('max_retries', 0),
+                t.get('retry_policy')
+            ))
+
+        with self._writer() as conn:
+            conn.executemany(_SQL_INSERT_TASK, rows)
+            # IDs are allocated consecutively while we hold the write lock
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            task_ids = list(range(last_id - len(rows) + 1, last_id + 1))
+
+            for task_id, t in zip(task_ids, tasks):
+                for depends_on_task_id in t.get('depends_on') or ():
+                    self._check_dependency(conn, task_id, depends_on_task_id)
+                    conn.execute(_SQL_INSERT_DEPENDENCY, (task_id, depends_on_task_id))
+
+            # Complete cache hits in the same transaction, before any worker
+            # can see them as pending
+            wanted = {key for key in cache_keys if key}
+            if wanted:
+                placeholders = ','.join('?' * len(wanted))
+                cached = dict(_tuple_cursor(conn).execute(
+                    f"SELECT key, result FROM result_cache WHERE key IN ({placeholders})",
+                    list(wanted)
+                ).fetchall())
+                hits = [(task_id, key) for task_id, key in zip(task_ids, cache_keys)
+                        if key in cached]
+                if hits:
+                    # A hit still waits for its dependencies, like any other task
+                    ready = {row[0] for row in _tuple_cursor(conn).execute(
+                        f"SELECT id FROM tasks t WHERE id IN ({','.join('?' * len(hits))}) "
+                        f"AND" + _SQL_DEPENDENCIES_MET,
+                        [task_id for task_id, _ in hits]
+                    )}
+                    hits = [(task_id, key) for task_id, key in hits if task_id in ready]
+                    cached = {key: cached[key] for _, key in hits}
+                if hits:
+                    conn.executemany(_SQL_COMPLETE_FROM_CACHE, [
+                        (cached[key], task_id) for task_id, key in hits
+                    ])
+                    conn.execute(
+                        f"UPDATE result_cache SET used_at = CURRENT_TIMESTAMP "
+                        f"WHERE key IN ({','.join('?' * len(cached))})",
+                        list(cached)
+                    )
+
+        return task_ids
+
+    @staticmethod
+    def result_cache_key(task: Dict) -> str:
+        """
+        Key identifying a task's inputs for the result cache
+
+        Hashes the prompt, working directory, context files, expected outputs
+        and metadata (which carries verification hooks), with list order and
+        dict key order ignored.
+
+        Args:
+            task: Dict with the same keys as add_task's arguments
+
+        Returns:
+            Hex digest (BLAKE2b, 128-bit)
+        """
+        metadata = dict(task.get('metadata') or {})
+        metadata.pop('result_cache_key', None)
+        material = json.dumps([
+            task['prompt'],
+            task.get('working_dir'),
+            sorted(task.get('context_files') or []),
+            sorted(task.get('expected_outputs') or []),
+            metadata,
+        ], sort_keys=True, separators=_JSON_SEPARATORS, default=str)
+        return hashlib.blake2b(material.encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def decode_json(value: Union[str, bytes, None]):
+        """
+        Decode a JSON column value from a task row (result, metadata, ...)
+
+        Uses orjson when it is installed; None passes through unchanged.
+        """
+        return _json_loads(value) if value is not None else None
+
+    @staticmethod
+    def _task_params(prompt: str, working_dir: Optional[str],
+                     context_files: Optional[List[str]],
+                     expected_outputs: Optional[List[str]],
+                     metadata: Optional[Dict], priority: int,
+                     job_id: Optional[str], parent_task_id: Optional[int],
+                     max_retries: int, retry_policy: Optional[Dict]) -> tuple:
+        """Build the parameter tuple for _SQL_INSERT_TASK"""
+        return (
             prompt,
             working_dir,
-            json.dumps(context_files) if context_files else None,
-            json.dumps(expected_outputs) if expected_outputs else None,
-            json.dumps(metadata) if metadata else None,
+            _json_dumps(context_files) if context_files else None,
+            _json_dumps(expected_outputs) if expected_outputs else None,
+            _json_dumps(metadata) if metadata else None,
             priority,
             job_id,
             parent_task_id,
             max_retries,
-            json.dumps(retry_policy) if retry_policy else None
-        ))
-        conn.commit()
-        return cursor.lastrowid
+            _json_dumps(retry_policy) if retry_policy else None
+        )
 
     def claim_task(self, worker_id: str) -> Optional[Dict]:
         """
@@ -463,75 +1207,82 @@ class TaskQueue:
         Returns:
             Task dictionary if claimed, None if no tasks available
         """
-        conn = self._get_conn()
+        with self._writer() as conn:
+            # fetchall() steps the statement to completion before the commit
+            rows = conn.execute(_SQL_CLAIM_NEXT, (worker_id,)).fetchall()
 
-        # Use transaction to ensure atomicity
-        conn.execute("BEGIN EXCLUSIVE")
-        try:
-            # Get pending OR paused tasks ordered by priority
-            # Pending tasks have priority over paused ones
-            # We'll check dependencies for each until we find one we can claim
-            cursor = conn.execute("""
-                SELECT * FROM tasks
-                WHERE status IN ('pending', 'paused')
-                ORDER BY
-                    CASE status
-                        WHEN 'pending' THEN 0
-                        WHEN 'paused' THEN 1
-                    END,
-                    priority DESC,
-                    created_at ASC
-                LIMIT 10
-            """)
-            tasks = cursor.fetchall()
+        if not rows:
+            # No claimable tasks
+            return None
 
-            if not tasks:
-                conn.rollback()
-                return None
+        task = rows[0]
 
-            # Find first task with met dependencies
-            for task in tasks:
-                if self.are_dependencies_met(task['id']):
-                    # Determine new status based on current status
-                    new_status = 'claimed' if task['status'] == 'pending' else 'resuming'
+        # Callers have always received the status the task had before the
+        # claim ('pending' or 'paused'), so map the new status back
+        claimed = dict(task)
+        claimed['status'] = 'pending' if task['status'] == 'claimed' else 'paused'
+        return claimed
 
-                    # Claim it
-                    conn.execute("""
-                        UPDATE tasks
-                        SET status = ?, worker_id = ?, claimed_at = ?
-                        WHERE id = ?
-                    """, (new_status, worker_id, datetime.now(), task['id']))
+    def claim_and_start_task(self, worker_id: str) -> Optional[Dict]:
+        """
+        Claim the next available task and mark it in progress in one step
 
-                    conn.commit()
-                    return dict(task)
+        Picks the same task claim_task() would, but a worker that starts
+        work immediately saves the separate start_task() write.
 
-            # No tasks with met dependencies
-            conn.rollback()
-            return None
+        Args:
+            worker_id: Worker identifier claiming the task
 
-        except Exception as e:
-            conn.rollback()
-            raise e
+        Returns:
+            Task dictionary (status 'in_progress') if claimed, None if no
+            tasks available
+        """
+        with self._writer() as conn:
+            rows = conn.execute(_SQL_CLAIM_AND_START_NEXT, (worker_id,)).fetchall()
+
+        return dict(rows[0]) if rows else None
 
     def start_task(self, task_id: int, worker_id: str):
         """Mark task as in progress"""
-        conn = self._get_conn()
-        conn.execute("""
-            UPDATE tasks
-            SET status = 'in_progress', started_at = ?
-            WHERE id = ? AND worker_id = ?
-        """, (datetime.now(), task_id, worker_id))
-        conn.commit()
-
-    def complete_task(self, task_id: int, worker_id: str, result: Optional[Dict] = None):
-        """Mark task as completed"""
-        conn = self._get_conn()
-        conn.execute("""
-            UPDATE tasks
-            SET status = 'completed', completed_at = ?, result = ?
-            WHERE id = ? AND worker_id = ?
-        """, (datetime.now(), json.dumps(result) if result else None, task_id, worker_id))
-        conn.commit()
+        with self._writer() as conn:
+            conn.execute(_SQL_START_TASK, (task_id, worker_id))
+
+    def complete_task(self, task_id: int, worker_id: str,
+                      result: Union[Dict, str, bytes, None] = None):
+        """
+        Mark task as completed
+
+        Args:
+            task_id: Task ID
+            worker_id: Worker ID
+            result: Result dict, or its already-encoded JSON (str or UTF-8 bytes)
+        """
+        self.flush_changes()
+
+        # Encode before taking the writer lock; results can carry up to a
+        # megabyte each of CLI stdout/stderr
+        if not result:
+            result_json = None
+        elif isinstance(result, bytes):
+            result_json = result.decode()
+        elif isinstance(result, str):
+            result_json = result
+        else:
+            result_json = _json_dumps(result)
+
+        with self._writer() as conn:
+            rows = conn.execute(_SQL_COMPLETE_TASK, (result_json, task_id, worker_id)).fetchall()
+
+            # Tasks submitted with use_result_cache carry their cache key
+            metadata = rows[0]['metadata'] if rows else None
+            if result_json and metadata and 'result_cache_key' in metadata:
+                cache_key = _json_loads(metadata).get('result_cache_key')
+                if cache_key:
+                    conn.execute(_SQL_CACHE_RESULT, (cache_key, result_json))
+                    conn.execute(_SQL_PRUNE_RESULT_CACHE, (self._RESULT_CACHE_SIZE,))
+
+        if rows and rows[0]['job_id']:
+            self._notify_job(rows[0]['job_id'])
 
     def fail_task(self, task_id: int, worker_id: str, error: str, auto_retry: bool = True):
         """
@@ -546,147 +1297,202 @@ class TaskQueue:
             error: Error message
             auto_retry: Automatically retry if retries remaining (default: True)
         """
-        conn = self._get_conn()
+        self.flush_changes()
 
-        # Update task status and error
-        conn.execute("""
-            UPDATE tasks
-            SET status = 'failed', completed_at = ?, error = ?, last_error = ?
-            WHERE id = ? AND worker_id = ?
-        """, (datetime.now(), error, error, task_id, worker_id))
-        conn.commit()
-
-        # Check if should auto-retry
-        if auto_retry and self.should_retry_task(task_id):
+        # Error context goes in front of the prompt (_build_retry_prompt
+        # with the prompt left to SQL)
+        prefix = self._build_retry_prompt("", error) if error else ""
+
+        with self._writer() as conn:
+            rows = conn.execute(_SQL_FAIL_TASK, {
+                'retry': 1 if auto_retry else 0,
+                'prefix': prefix,
+                'error': error,
+                'task_id': task_id,
+                'worker_id': worker_id,
+            }).fetchall()
+
+        if not rows:
+            return
+
+        if rows[0]['status'] == 'pending':
             print(f"[TaskQueue] Auto-retrying task {task_id} (has retries remaining)")
-            self.retry_task(task_id, include_error_context=True)
+        elif rows[0]['job_id']:
+            self._notify_job(rows[0]['job_id'])
 
     def register_worker(self, worker_id: str):
         """Register a new worker"""
-        conn = self._get_conn()
-        conn.execute("""
-            INSERT OR REPLACE INTO workers (worker_id, status, last_heartbeat)
-            VALUES (?, 'idle', ?)
-        """, (worker_id, datetime.now()))
-        conn.commit()
+        with self._writer() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO workers (worker_id, status, last_heartbeat)
+                VALUES (?, 'idle', CURRENT_TIMESTAMP)
+            """, (worker_id,))
 
     def update_worker_heartbeat(self, worker_id: str, status: str = 'active',
                                 current_task_id: Optional[int] = None):
         """Update worker heartbeat"""
-        conn = self._get_conn()
-        conn.execute("""
-            UPDATE workers
-            SET last_heartbeat = ?, status = ?, current_task_id = ?
-            WHERE worker_id = ?
-        """, (datetime.now(), status, current_task_id, worker_id))
-        conn.commit()
+        with self._writer() as conn:
+            conn.execute(_SQL_WORKER_HEARTBEAT, (status, current_task_id, worker_id))
 
     def get_task(self, task_id: int) -> Optional[Dict]:
         """Get task by ID"""
-        conn = self._get_conn()
-        cursor = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        with self._reader() as conn:
+            cursor = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
 
     def get_all_tasks(self, status: Optional[str] = None) -> List[Dict]:
         """Get all tasks, optionally filtered by status"""
-        conn = self._get_conn()
-        if status:
-            cursor = conn.execute(
-                "SELECT * FROM tasks WHERE status = ? ORDER BY priority DESC, created_at",
-                (status,)
-            )
-        else:
-            cursor = conn.execute("SELECT * FROM tasks ORDER BY created_at DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        return list(self.iter_tasks(status))
+
+    def iter_tasks(self, status: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream tasks one dict at a time, optionally filtered by status
+
+        Same rows and order as get_all_tasks(). A reader connection is held
+        until the iterator is exhausted or closed, so consume it promptly.
+
+        Example:
+            ```python
+            for task in queue.iter_tasks(status='completed'):
+                print(task['id'], task['result'])
+            ```
+        """
+        with self._reader() as conn:
+            if status:
+                cursor = conn.execute(
+                    "SELECT * FROM tasks WHERE status = ? ORDER BY priority DESC, created_at",
+                    (status,)
+                )
+            else:
+                cursor = conn.execute("SELECT * FROM tasks ORDER BY created_at DESC")
+            cursor.arraysize = 256
+            keys = [column[0] for column in cursor.description]
+
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+
+                for row in rows:
+                    yield dict(zip(keys, row))
 
     def get_all_workers(self) -> List[Dict]:
         """Get all registered workers"""
-        conn = self._get_conn()
-        cursor = conn.execute("SELECT * FROM workers ORDER BY worker_id")
-        return [dict(row) for row in cursor.fetchall()]
+        with self._reader() as conn:
+            cursor = conn.execute("SELECT * FROM workers ORDER BY worker_id")
+            return _rows_to_dicts(cursor)
 
     def get_stats(self) -> Dict:
         """Get queue statistics"""
-        conn = self._get_conn()
-        stats = {}
+        with self._reader() as conn:
+            stats = dict.fromkeys(_STATUS_VALUES, 0)
 
-        for status in TaskStatus:
-            cursor = conn.execute(
-                "SELECT COUNT(*) as count FROM tasks WHERE status = ?",
-                (status.value,)
+            cursor = _tuple_cursor(conn).execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"
             )
-            stats[status.value] = cursor.fetchone()[0]
+            for status, count in cursor.fetchall():
+                if status in stats:
+                    stats[status] = count
 
-        cursor = conn.execute("SELECT COUNT(*) as count FROM workers WHERE status = 'active'")
-        stats['active_workers'] = cursor.fetchone()[0]
+            cursor = _tuple_cursor(conn).execute("""
+                SELECT COALESCE(SUM(status = 'active'), 0), COUNT(*) FROM workers
+            """)
+            stats['active_workers'], stats['total_workers'] = cursor.fetchone()
 
-        cursor = conn.execute("SELECT COUNT(*) as count FROM workers")
-        stats['total_workers'] = cursor.fetchone()[0]
+            return stats
 
-        return stats
+    def get_stats_json(self) -> str:
+        """
+        Get queue statistics as a JSON string
+
+        Same keys and values as get_stats(), but the JSON is built by SQLite,
+        for callers that would only serialize the dict again (e.g. HTTP).
+        """
+        with self._reader() as conn:
+            return _tuple_cursor(conn).execute(_SQL_STATS_JSON).fetchone()[0]
 
     def create_job(self, job_id: str, description: str, orchestrator_id: str,
                    metadata: Optional[Dict] = None):
         """Create a new job"""
-        conn = self._get_conn()
-        conn.execute("""
-            INSERT INTO jobs (job_id, description, orchestrator_id, metadata)
-            VALUES (?, ?, ?, ?)
-        """, (job_id, description, orchestrator_id, json.dumps(metadata) if metadata else None))
-        conn.commit()
+        with self._writer() as conn:
+            conn.execute("""
+                INSERT INTO jobs (job_id, description, orchestrator_id, metadata)
+                VALUES (?, ?, ?, ?)
+            """, (job_id, description, orchestrator_id, _json_dumps(metadata) if metadata else None))
 
     def get_job(self, job_id: str) -> Optional[Dict]:
         """Get job by ID"""
-        conn = self._get_conn()
-        cursor = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        with self._reader() as conn:
+            cursor = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
 
     def get_job_tasks(self, job_id: str, status: Optional[str] = None) -> List[Dict]:
         """Get all tasks for a job"""
-        conn = self._get_conn()
-        if status:
-            cursor = conn.execute(
-                "SELECT * FROM tasks WHERE job_id = ? AND status = ? ORDER BY created_at",
-                (job_id, status)
-            )
-        else:
-            cursor = conn.execute(
-                "SELECT * FROM tasks WHERE job_id = ? ORDER BY created_at",
-                (job_id,)
-            )
-        return [dict(row) for row in cursor.fetchall()]
+        with self._reader() as conn:
+            if status:
+                cursor = conn.execute(
+                    "SELECT * FROM tasks WHERE job_id = ? AND status = ? ORDER BY created_at",
+                    (job_id, status)
+                )
+            else:
+                cursor = conn.execute(
+                    "SELECT * FROM tasks WHERE job_id = ? ORDER BY created_at",
+                    (job_id,)
+                )
+            return _rows_to_dicts(cursor)
+
+    def get_job_task_summaries(self, job_id: str, prompt_chars: int = 60) -> List[Dict]:
+        """
+        Get lightweight summaries of a job's tasks
+
+        Only the id, status, priority and the first prompt_chars characters of
+        the prompt are read, so large prompts never leave SQLite.
+        """
+        with self._reader() as conn:
+            cursor = conn.execute("""
+                SELECT id, SUBSTR(prompt, 1, ?) AS prompt, status, priority
+                FROM tasks
+                WHERE job_id = ?
+                ORDER BY created_at
+            """, (prompt_chars, job_id))
+            return _rows_to_dicts(cursor)
 
     def get_job_stats(self, job_id: str) -> Dict:
         """Get statistics for a specific job"""
-        conn = self._get_conn()
-        stats = {}
+        with self._reader() as conn:
+            stats = dict.fromkeys(_STATUS_VALUES, 0)
 
-        for status in TaskStatus:
-            cursor = conn.execute(
-                "SELECT COUNT(*) as count FROM tasks WHERE job_id = ? AND status = ?",
-                (job_id, status.value)
+            cursor = _tuple_cursor(conn).execute(
+                "SELECT status, count FROM job_status_counts WHERE job_id = ?",
+                (job_id,)
             )
-            stats[status.value] = cursor.fetchone()[0]
+            for status, count in cursor.fetchall():
+                if status in stats:
+                    stats[status] = count
 
-        return stats
+            return stats
 
     def complete_job(self, job_id: str):
         """Mark job as completed"""
-        conn = self._get_conn()
-        conn.execute("""
-            UPDATE jobs
-            SET status = 'completed', completed_at = ?
-            WHERE job_id = ?
-        """, (datetime.now(), job_id))
-        conn.commit()
+        with self._writer() as conn:
+            conn.execute("""
+                UPDATE jobs
+                SET status = 'completed', completed_at = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+            """, (job_id,))
 
     def wait_for_job_completion(self, job_id: str, poll_interval: float = 2.0,
                                 timeout: Optional[float] = None) -> bool:
-        """Wait for all tasks in a job to complete"""
-        import time as time_module
-        start_time = time_module.time()
+        """
+        Wait for all tasks in a job to complete
+
+        Wakes immediately when a task of the job completes or fails through
+        this TaskQueue; changes made by other processes are picked up on
+        the next poll_interval re-check.
+        """
+        start_time = time.time()
 
         while True:
             stats = self.get_job_stats(job_id)
@@ -695,33 +1501,152 @@ class TaskQueue:
             if pending == 0:
                 return True
 
-            if timeout and (time_module.time() - start_time) > timeout:
-                return False
+            wait = poll_interval
+            if timeout:
+                remaining = timeout - (time.time() - start_time)
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            self.wait_for_change(job_id, wait)
+
+    def wait_for_change(self, job_id: str, timeout: float) -> bool:
+        """
+        Block until the database may have changed, or timeout elapses
+
+        Tasks of the job completing or failing through this TaskQueue wake the
+        wait at once. Commits from any other connection or process (workers)
+        are noticed within _DATA_VERSION_INTERVAL via PRAGMA data_version,
+        which reads a counter rather than any table. Callers re-query after a
+        wake; a True return only means something was committed.
+
+        Args:
+            job_id: Job whose in-process completion signal to wait on
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if a change was seen, False if the timeout elapsed
 
-            time_module.sleep(poll_interval)
+        Example:
+            ```python
+            while queue.get_job_stats(job_id)['pending']:
+                queue.wait_for_change(job_id, 30)
+            ```
+        """
+        deadline = time.monotonic() + timeout
+        condition = self._job_condition(job_id)
+        version = self._data_version()
+
+        with condition:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if condition.wait(min(self._DATA_VERSION_INTERVAL, remaining)):
+                    return True
+                if self._data_version() != version:
+                    return True
+
+    def _data_version(self) -> int:
+        """Read PRAGMA data_version on the dedicated version connection"""
+        with self._version_lock:
+            if self._version_conn is None:
+                self._version_conn = self._connect(read_only=True)
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _job_condition(self, job_id: str) -> threading.Condition:
+        """Get (or create) the condition signalled when a job's tasks finish"""
+        with self._job_conds_lock:
+            condition = self._job_conds.get(job_id)
+            if condition is None:
+                condition = self._job_conds[job_id] = threading.Condition()
+            return condition
+
+    def _notify_job(self, job_id: str):
+        """Wake in-process waiters for a job (call after the write has committed)"""
+        with self._job_conds_lock:
+            condition = self._job_conds.get(job_id)
+        if condition is not None:
+            with condition:
+                condition.notify_all()
 
     def get_child_tasks(self, parent_task_id: int) -> List[Dict]:
         """Get all child tasks of a parent task"""
-        conn = self._get_conn()
-        cursor = conn.execute(
-            "SELECT * FROM tasks WHERE parent_task_id = ? ORDER BY created_at",
-            (parent_task_id,)
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        with self._reader() as conn:
+            cursor = conn.execute(
+                "SELECT * FROM tasks WHERE parent_task_id = ? ORDER BY created_at",
+                (parent_task_id,)
+            )
+            return _rows_to_dicts(cursor)
 
     def cleanup_stale_tasks(self, timeout_seconds: int = 3600):
         """Reset tasks claimed by workers that haven't sent heartbeat"""
-        conn = self._get_conn()
-        conn.execute("""
-            UPDATE tasks
-            SET status = 'pending', worker_id = NULL, claimed_at = NULL
-            WHERE status IN ('claimed', 'in_progress')
-            AND worker_id IN (
-                SELECT worker_id FROM workers
-                WHERE julianday('now') - julianday(last_heartbeat) > ?
-            )
-        """, (timeout_seconds / 86400.0,))
-        conn.commit()
+        with self._writer() as conn:
+            conn.execute("""
+                UPDATE tasks
+                SET status = 'pending', worker_id = NULL, claimed_at = NULL
+                WHERE status IN ('claimed', 'in_progress')
+                AND worker_id IN (
+                    SELECT worker_id FROM workers
+                    WHERE last_heartbeat < datetime('now', ?)
+                )
+            """, (f"-{timeout_seconds} seconds",))
+
+    def prune_logs(self, max_age_days: int = 7, max_per_worker: int = 1000) -> int:
+        """
+        Delete old worker progress logs so the table does not grow forever
+
+        Args:
+            max_age_days: Delete logs older than this many days
+            max_per_worker: Keep at most this many recent logs per worker
+
+        Returns:
+            Number of log rows deleted
+        """
+        with self._writer() as conn:
+            cursor = conn.execute("""
+                DELETE FROM worker_logs
+                WHERE timestamp < datetime('now', ?)
+            """, (f"-{max_age_days} days",))
+            deleted = cursor.rowcount
+
+            cursor = conn.execute("""
+                DELETE FROM worker_logs
+                WHERE log_id IN (
+                    SELECT log_id FROM (
+                        SELECT log_id,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY worker_id
+                                   ORDER BY timestamp DESC, log_id DESC
+                               ) AS rn
+                        FROM worker_logs
+                    )
+                    WHERE rn > ?
+                )
+            """, (max_per_worker,))
+            deleted += cursor.rowcount
+
+            return deleted
+
+    def maintenance(self, max_log_age_days: int = 7, max_logs_per_worker: int = 1000):
+        """
+        Run periodic database maintenance (e.g. nightly)
+
+        Prunes old worker logs, refreshes query planner statistics with
+        PRAGMA optimize, releases free pages and truncates the write-ahead
+        log so it does not grow without bound.
+
+        Args:
+            max_log_age_days: Passed to prune_logs()
+            max_logs_per_worker: Passed to prune_logs()
+        """
+        self.prune_logs(max_log_age_days, max_logs_per_worker)
+
+        # wal_checkpoint cannot run inside a transaction
+        with self._writer(transaction=False) as conn:
+            conn.execute("PRAGMA optimize")
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
 
     # Convenience aliases for more intuitive API
     def list_tasks(self, status: Optional[str] = None, job_id: Optional[str] = None) -> List[Dict]:
@@ -747,123 +1672,91 @@ class TaskQueue:
 
             # Get all tasks
             all_tasks = queue.list_tasks()
+
+        Raises:
+            ValueError: If status is not a known task status
         """
+        if status and status not in _STATUS_VALUES:
+            raise ValueError(
+                f"Unknown task status: {status!r} "
+                f"(expected one of: {', '.join(_STATUS_VALUES)})"
+            )
         if job_id:
             return self.get_job_tasks(job_id, status)
         else:
             return self.get_all_tasks(status)
 
-    def list_workers(self) -> List[Dict]:
-        """
-        List all registered workers
-
-        Returns:
-            List of worker dictionaries with status and heartbeat info
+    def count_tasks(self, status: Optional[str] = None, job_id: Optional[str] = None) -> int:
         """
-        return self.get_all_workers()
+        Count tasks with optional filters, without fetching them
 
-    # Public API Methods (for external access)
-
-    def get_connection(self):
-        """
-        Get database connection for custom queries
+        Args:
+            status: Filter by task status
+            job_id: Filter by job ID
 
         Returns:
-            sqlite3.Connection with row_factory set
+            Number of matching tasks
 
         Example:
             ```python
-            conn = queue.get_connection()
-            cursor = conn.execute("SELECT * FROM tasks WHERE priority > 5")
-            tasks = [dict(row) for row in cursor.fetchall()]
+            pending = queue.count_tasks(status='pending')
             ```
         """
-        return self._get_conn()
-
-    def log_worker_progress(self, worker_id: str, message: str,
-                           task_id: Optional[int] = None, level: str = 'info'):
-        """
-        Log worker progress message for real-time visibility
+        conditions = []
+        params = []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if job_id:
+            conditions.append("job_id = ?")
+            params.append(job_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
-        Args:
-            worker_id: Worker ID
-            message: Progress message
-            task_id: Optional task ID being worked on
-            level: Log level ('info', 'warning', 'error')
-        """
-        conn = self._get_conn()
-        conn.execute("""
-            INSERT INTO worker_logs (worker_id, task_id, message, level)
-            VALUES (?, ?, ?, ?)
-        """, (worker_id, task_id, message, level))
-        conn.commit()
+        with self._reader() as conn:
+            cursor = _tuple_cursor(conn).execute(
+                f"SELECT COUNT(*) FROM tasks {where}", params
+            )
+            return cursor.fetchone()[0]
 
-    def get_worker_logs(self, worker_id: Optional[str] = None,
-                       task_id: Optional[int] = None, limit: int = 100) -> List[Dict]:
+    def list_workers(self) -> List[Dict]:
         """
-        Get worker progress logs
-
-        Args:
-            worker_id: Optional worker ID filter
-            task_id: Optional task ID filter
-            limit: Maximum number of logs to return
+        List all registered workers
 
         Returns:
-            List of log dictionaries
-        """
-        conn = self._get_conn()
-
-        if worker_id and task_id:
-            query = """
-                SELECT * FROM worker_logs
-                WHERE worker_id = ? AND task_id = ?
-                ORDER BY timestamp DESC LIMIT ?
-            """
-            params = (worker_id, task_id, limit)
-        elif worker_id:
-            query = """
-                SELECT * FROM worker_logs
-                WHERE worker_id = ?
-                ORDER BY timestamp DESC LIMIT ?
-            """
-            params = (worker_id, limit)
-        elif task_id:
-            query = """
-                SELECT * FROM worker_logs
-                WHERE task_id = ?
-                ORDER BY timestamp DESC LIMIT ?
-            """
-            params = (task_id, limit)
-        else:
-            query = """
-                SELECT * FROM worker_logs
-                ORDER BY timestamp DESC LIMIT ?
-            """
-            params = (limit,)
-
-        cursor = conn.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+            List of worker dictionaries with status and heartbeat info
+        """
+        return self.get_all_workers()
 
     def get_active_progress(self) -> List[Dict]:
         """
         Get current progress across all active workers
 
         Returns:
-            List of worker progress dictionaries with recent activity
-        """
-        conn = self._get_conn()
-        cursor = conn.execute("""
-            SELECT w.worker_id, w.status, w.current_task_id,
-                   t.prompt as current_task_prompt,
-                   (SELECT message FROM worker_logs
-                    WHERE worker_id = w.worker_id
-                    ORDER BY timestamp DESC LIMIT 1) as last_message
-            FROM workers w
-            LEFT JOIN tasks t ON w.current_task_id = t.id
-            WHERE w.status = 'active'
-            ORDER BY w.last_heartbeat DESC
-        """)
-        return [dict(row) for row in cursor.fetchall()]
+            List of dictionaries with worker status and current task info,
+            most recent heartbeat first:
+            - worker_id: Worker identifier
+            - status: Worker status
+            - current_task_id: Current task ID (if any)
+            - current_task_prompt: Current task prompt (if any)
+            - last_message: Most recent log message
+
+        The latest log message is looked up per worker through the
+        (worker_id, timestamp DESC) index, so this stays cheap no matter
+        how large worker_logs grows.
+
+        Example:
+            ```python
+            progress = queue.get_active_progress()
+            for worker in progress:
+                if worker['current_task_id']:
+                    print(f"{worker['worker_id']}: {worker['current_task_prompt'][:50]}...")
+                else:
+                    print(f"{worker['worker_id']}: Idle")
+            ```
+        """
+        with self._reader() as conn:
+            cursor = conn.execute(_SQL_ACTIVE_PROGRESS)
+            return _rows_to_dicts(cursor)
 
     def get_job_progress(self, job_id: str) -> Dict:
         """
@@ -876,21 +1769,13 @@ class TaskQueue:
             Dictionary with job progress details
         """
         stats = self.get_job_stats(job_id)
-        tasks = self.get_job_tasks(job_id)
+        summaries = self.get_job_task_summaries(job_id)
 
         return {
             'job_id': job_id,
             'stats': stats,
-            'total_tasks': len(tasks),
-            'task_summaries': [
-                {
-                    'id': t['id'],
-                    'prompt': t['prompt'][:60],
-                    'status': t['status'],
-                    'priority': t['priority']
-                }
-                for t in tasks
-            ]
+            'total_tasks': len(summaries),
+            'task_summaries': summaries
         }
 
     # Shared Context API
@@ -920,15 +1805,14 @@ class TaskQueue:
             )
             ```
         """
-        conn = self._get_conn()
-        conn.execute("""
-            INSERT INTO shared_context (job_id, key, value, updated_at)
-            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(job_id, key) DO UPDATE SET
-                value = excluded.value,
-                updated_at = CURRENT_TIMESTAMP
-        """, (job_id, key, value))
-        conn.commit()
+        with self._writer() as conn:
+            conn.execute("""
+                INSERT INTO shared_context (job_id, key, value, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(job_id, key) DO UPDATE SET
+                    value = excluded.value,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (job_id, key, value))
 
     # Checkpoint API for pause/resume functionality
 
@@ -960,22 +1844,89 @@ class TaskQueue:
             )
             ```
         """
-        conn = self._get_conn()
-        conn.execute("""
-            INSERT OR REPLACE INTO checkpoints
-            (task_id, checkpoint_data, files_created, files_modified,
-             last_step, completion_percentage, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+        with self._writer() as conn:
+            self._save_checkpoint_no_commit(
+                conn, task_id, checkpoint_data, files_created, files_modified,
+                last_step, completion_percentage
+            )
+
+    def _save_checkpoint_no_commit(self, conn: sqlite3.Connection, task_id: int,
+                                   checkpoint_data: Dict,
+                                   files_created: Optional[List[str]] = None,
+                                   files_modified: Optional[List[str]] = None,
+                                   last_step: Optional[str] = None,
+                                   completion_percentage: int = 0):
+        """Write a checkpoint on the writer connection, leaving the commit to the caller"""
+        conn.execute(_SQL_SAVE_CHECKPOINT, self._checkpoint_params(
+            task_id, checkpoint_data, files_created, files_modified,
+            last_step, completion_percentage
+        ))
+
+    def save_checkpoints_bulk(self, checkpoints: List[Dict]):
+        """
+        Save checkpoints for several tasks in a single transaction
+
+        Args:
+            checkpoints: List of dicts with the same keys as save_checkpoint's
+                arguments (task_id and checkpoint_data are required)
+
+        Example:
+            ```python
+            queue.save_checkpoints_bulk([
+                {"task_id": 5, "checkpoint_data": {"phase": "testing"}},
+                {"task_id": 6, "checkpoint_data": {"phase": "build"},
+                 "completion_percentage": 40},
+            ])
+            ```
+        """
+        with self._writer() as conn:
+            rows = [
+                self._checkpoint_params(
+                    cp['task_id'],
+                    cp['checkpoint_data'],
+                    cp.get('files_created'),
+                    cp.get('files_modified'),
+                    cp.get('last_step'),
+                    cp.get('completion_percentage', 0)
+                )
+                for cp in checkpoints
+            ]
+            conn.executemany(_SQL_SAVE_CHECKPOINT, rows)
+
+    def _checkpoint_params(self, task_id: int, checkpoint_data: Dict,
+                           files_created: Optional[List[str]],
+                           files_modified: Optional[List[str]],
+                           last_step: Optional[str],
+                           completion_percentage: int) -> tuple:
+        """Build the parameter tuple for _SQL_SAVE_CHECKPOINT (call under the writer lock)"""
+        return (
             task_id,
-            json.dumps(checkpoint_data),
-            json.dumps(files_created) if files_created else None,
-            json.dumps(files_modified) if files_modified else None,
+            _json_dumpb(checkpoint_data),
+            self._cached_list_json(task_id, 'files_created', files_created),
+            self._cached_list_json(task_id, 'files_modified', files_modified),
             last_step,
-            completion_percentage,
-            datetime.now()
-        ))
-        conn.commit()
+            completion_percentage
+        )
+
+    def _cached_list_json(self, task_id: int, field: str,
+                          values: Optional[List[str]]) -> Optional[bytes]:
+        """JSON-encode a checkpoint file list, reusing the last encoding if unchanged"""
+        if not values:
+            return None
+
+        key = (task_id, field)
+        snapshot = tuple(values)
+        cached = self._json_cache.get(key)
+        if cached is not None and cached[0] == snapshot:
+            self._json_cache.move_to_end(key)
+            return cached[1]
+
+        encoded = _json_dumpb(values)
+        self._json_cache[key] = (snapshot, encoded)
+        self._json_cache.move_to_end(key)
+        if len(self._json_cache) > self._JSON_CACHE_SIZE:
+            self._json_cache.popitem(last=False)
+        return encoded
 
     def get_checkpoint(self, task_id: int) -> Optional[Dict]:
         """
@@ -995,25 +1946,25 @@ class TaskQueue:
                 print(f"Progress: {checkpoint['completion_percentage']}%")
             ```
         """
-        conn = self._get_conn()
-        cursor = conn.execute("""
-            SELECT * FROM checkpoints WHERE task_id = ?
-        """, (task_id,))
-        row = cursor.fetchone()
+        with self._reader() as conn:
+            cursor = conn.execute("""
+                SELECT * FROM checkpoints WHERE task_id = ?
+            """, (task_id,))
+            row = cursor.fetchone()
 
-        if not row:
-            return None
+            if not row:
+                return None
 
-        return {
-            'task_id': row['task_id'],
-            'checkpoint_data': json.loads(row['checkpoint_data']) if row['checkpoint_data'] else {},
-            'files_created': json.loads(row['files_created']) if row['files_created'] else [],
-            'files_modified': json.loads(row['files_modified']) if row['files_modified'] else [],
-            'last_step': row['last_step'],
-            'completion_percentage': row['completion_percentage'],
-            'created_at': row['created_at'],
-            'updated_at': row['updated_at']
-        }
+            return {
+                'task_id': row['task_id'],
+                'checkpoint_data': _json_loads(row['checkpoint_data']) if row['checkpoint_data'] else {},
+                'files_created': _json_loads(row['files_created']) if row['files_created'] else [],
+                'files_modified': _json_loads(row['files_modified']) if row['files_modified'] else [],
+                'last_step': row['last_step'],
+                'completion_percentage': row['completion_percentage'],
+                'created_at': row['created_at'],
+                'updated_at': row['updated_at']
+            }
 
     def delete_checkpoint(self, task_id: int):
         """
@@ -1022,9 +1973,11 @@ class TaskQueue:
         Args:
             task_id: Task ID
         """
-        conn = self._get_conn()
-        conn.execute("DELETE FROM checkpoints WHERE task_id = ?", (task_id,))
-        conn.commit()
+        with self._writer() as conn:
+            conn.execute("DELETE FROM checkpoints WHERE task_id = ?", (task_id,))
+
+            self._json_cache.pop((task_id, 'files_created'), None)
+            self._json_cache.pop((task_id, 'files_modified'), None)
 
     def pause_task(self, task_id: int, worker_id: str, checkpoint_data: Optional[Dict] = None):
         """
@@ -1048,17 +2001,17 @@ class TaskQueue:
             )
             ```
         """
-        conn = self._get_conn()
-        conn.execute("""
-            UPDATE tasks
-            SET status = 'paused', worker_id = ?
-            WHERE id = ?
-        """, (worker_id, task_id))
-        conn.commit()
+        # One transaction: a failed checkpoint write rolls the pause back
+        # instead of leaving it pending on the shared writer connection
+        with self._writer() as conn:
+            conn.execute("""
+                UPDATE tasks
+                SET status = 'paused', worker_id = ?
+                WHERE id = ?
+            """, (worker_id, task_id))
 
-        # Save checkpoint if provided
-        if checkpoint_data:
-            self.save_checkpoint(task_id, checkpoint_data)
+            if checkpoint_data:
+                self._save_checkpoint_no_commit(conn, task_id, checkpoint_data)
 
     def get_paused_tasks(self) -> List[Dict]:
         """
@@ -1067,13 +2020,28 @@ class TaskQueue:
         Returns:
             List of paused task dictionaries
         """
-        conn = self._get_conn()
-        cursor = conn.execute("""
-            SELECT * FROM tasks
-            WHERE status = 'paused'
-            ORDER BY priority DESC, created_at ASC
-        """)
-        return [dict(row) for row in cursor.fetchall()]
+        with self._reader() as conn:
+            cursor = conn.execute("""
+                SELECT * FROM tasks
+                WHERE status = 'paused'
+                ORDER BY priority DESC, created_at ASC
+            """)
+            return _rows_to_dicts(cursor)
+
+    def get_paused_task_ids(self) -> List[int]:
+        """
+        Get the IDs of paused tasks, in resume order
+
+        Returns:
+            List of task IDs
+        """
+        with self._reader() as conn:
+            cursor = conn.execute("""
+                SELECT id FROM tasks
+                WHERE status = 'paused'
+                ORDER BY priority DESC, created_at ASC
+            """)
+            return [row[0] for row in cursor]
 
     # Task changes API for rollback support
 
@@ -1109,21 +2077,174 @@ class TaskQueue:
                 after_content='...'
             )
             ```
+
+        Note:
+            The change is queued and written by a background thread in
+            batches. Reads of task changes, rollback_task(), complete_task()
+            and fail_task() flush the queue first; call flush_changes() to
+            wait for durability explicitly. Invalid arguments raise
+            ValueError here; a change that fails to write is raised from
+            the next flush.
+        """
+        self._validate_change(task_id, operation, file_path, before_content, after_content)
+        self._ensure_change_writer()
+        self._change_queue.put((
+            task_id, operation, file_path,
+            _pack_content(before_content), _pack_content(after_content)
+        ))
+
+    def flush_changes(self):
         """
-        conn = self._get_conn()
-        conn.execute("""
-            INSERT INTO task_changes
-            (task_id, operation, file_path, before_content, after_content)
-            VALUES (?, ?, ?, ?, ?)
-        """, (task_id, operation, file_path, before_content, after_content))
-        conn.commit()
+        Block until every queued track_file_change() call is written
+
+        Raises:
+            sqlite3.Error: If the background writer failed to record a
+                queued change since the last flush (the first such error)
+        """
+        if self._change_thread is None:
+            return
+
+        self._change_queue.join()
+        with self._change_thread_lock:
+            error, self._change_error = self._change_error, None
+        if error is not None:
+            raise error
+
+    @staticmethod
+    def _validate_change(task_id, operation, file_path, before_content, after_content):
+        """Reject a file change the task_changes table can't store"""
+        if not isinstance(task_id, int):
+            raise ValueError(f"task_id must be an int, got {task_id!r}")
+        if operation not in _CHANGE_OPERATIONS:
+            raise ValueError(
+                f"Invalid operation {operation!r}; expected one of {', '.join(_CHANGE_OPERATIONS)}"
+            )
+        if not isinstance(file_path, str) or not file_path:
+            raise ValueError(f"file_path must be a non-empty string, got {file_path!r}")
+        for name, content in (('before_content', before_content), ('after_content', after_content)):
+            if content is not None and not isinstance(content, str):
+                raise ValueError(f"{name} must be a string or None, got {type(content).__name__}")
+
+    def _ensure_change_writer(self):
+        """Start the background task_changes writer on first use"""
+        if self._change_thread is not None:
+            return
+
+        with self._change_thread_lock:
+            if self._change_thread is None:
+                thread = threading.Thread(
+                    target=self._change_writer_loop, name="taskqueue-changes", daemon=True
+                )
+                thread.start()
+                self._change_thread = thread
+
+    def _change_writer_loop(self):
+        """Drain queued file changes and write them in batches"""
+        while True:
+            batch = [self._change_queue.get()]
+
+            # Give concurrent callers a moment to add to this batch
+            deadline = time.monotonic() + self._CHANGE_BATCH_WAIT
+            while len(batch) < self._CHANGE_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(self._change_queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._change_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                try:
+                    self._write_changes(batch)
+                except Exception:
+                    # Don't let one bad row lose the rest of the batch
+                    for change in batch:
+                        try:
+                            self._write_changes([change])
+                        except Exception as e:
+                            with self._change_thread_lock:
+                                if self._change_error is None:
+                                    self._change_error = e
+            finally:
+                for _ in batch:
+                    self._change_queue.task_done()
+
+    def _write_changes(self, changes: List[tuple]):
+        """Insert queued (task_id, operation, file_path, before, after) rows"""
+        with self._writer() as conn:
+            rows = [
+                (task_id, operation, self._file_path_id(conn, file_path),
+                 before_content, after_content)
+                for task_id, operation, file_path, before_content, after_content
+                in changes
+            ]
+            conn.executemany(_SQL_INSERT_TASK_CHANGE, rows)
+
+    def track_file_changes_bulk(self, changes: List[Dict]):
+        """
+        Track several file changes in a single transaction
 
-    def get_task_changes(self, task_id: int) -> List[Dict]:
+        Args:
+            changes: List of dicts with task_id, operation, file_path and
+                optional before_content / after_content
+
+        Example:
+            ```python
+            queue.track_file_changes_bulk([
+                {"task_id": 5, "operation": "create",
+                 "file_path": "src/a.ts", "after_content": "..."},
+                {"task_id": 5, "operation": "delete",
+                 "file_path": "src/b.ts", "before_content": "..."},
+            ])
+            ```
+        """
+        for change in changes:
+            self._validate_change(
+                change['task_id'], change['operation'], change['file_path'],
+                change.get('before_content'), change.get('after_content')
+            )
+
+        # Keep change order: anything queued by track_file_change goes first
+        self.flush_changes()
+
+        with self._writer() as conn:
+            rows = [
+                (
+                    change['task_id'],
+                    change['operation'],
+                    self._file_path_id(conn, change['file_path']),
+                    _pack_content(change.get('before_content')),
+                    _pack_content(change.get('after_content'))
+                )
+                for change in changes
+            ]
+            conn.executemany(_SQL_INSERT_TASK_CHANGE, rows)
+
+    def _file_path_id(self, conn: sqlite3.Connection, file_path: str) -> int:
+        """Intern a file path, returning its file_paths ID (call under the writer lock)"""
+        path_id = self._path_ids.get(file_path)
+        if path_id is not None:
+            return path_id
+
+        conn.execute("INSERT OR IGNORE INTO file_paths (path) VALUES (?)", (file_path,))
+        path_id = conn.execute(
+            "SELECT id FROM file_paths WHERE path = ?", (file_path,)
+        ).fetchone()[0]
+
+        if len(self._path_ids) >= self._PATH_ID_CACHE_SIZE:
+            self._path_ids.clear()
+        self._path_ids[file_path] = path_id
+        return path_id
+
+    def get_task_changes(self, task_id: int, reverse: bool = False) -> List[Dict]:
         """
         Get all file changes for a task
 
         Args:
             task_id: Task ID
+            reverse: Return newest changes first (default: oldest first)
 
         Returns:
             List of change dictionaries
@@ -1135,13 +2256,40 @@ class TaskQueue:
                 print(f"{change['operation']}: {change['file_path']}")
             ```
         """
-        conn = self._get_conn()
-        cursor = conn.execute("""
-            SELECT * FROM task_changes
-            WHERE task_id = ?
-            ORDER BY timestamp ASC
-        """, (task_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        return list(self.iter_task_changes(task_id, reverse=reverse))
+
+    def iter_task_changes(self, task_id: int, reverse: bool = False) -> Iterator[Dict]:
+        """
+        Stream file changes for a task without building the full list
+
+        Same rows and order as get_task_changes(). A reader connection is
+        held until the iterator is exhausted or closed, so consume it promptly.
+        """
+        self.flush_changes()
+
+        order = "DESC" if reverse else "ASC"
+        with self._reader() as conn:
+            cursor = conn.execute(f"""
+                SELECT tc.change_id, tc.task_id, tc.operation, fp.path AS file_path,
+                       tc.before_content, tc.after_content, tc.timestamp
+                FROM task_changes tc
+                JOIN file_paths fp ON fp.id = tc.file_path_id
+                WHERE tc.task_id = ?
+                ORDER BY tc.timestamp {order}, tc.change_id {order}
+            """, (task_id,))
+            cursor.arraysize = 256
+            keys = [column[0] for column in cursor.description]
+
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+
+                for row in rows:
+                    change = dict(zip(keys, row))
+                    change['before_content'] = _unpack_content(change['before_content'])
+                    change['after_content'] = _unpack_content(change['after_content'])
+                    yield change
 
     def rollback_task(self, task_id: int) -> Dict:
         """
@@ -1160,38 +2308,51 @@ class TaskQueue:
             print(f"Files deleted: {result['files_deleted']}")
             ```
         """
-        changes = self.get_task_changes(task_id)
+        # Only the earliest change to each file matters for restoring its
+        # pre-task state. Walking newest-first and overwriting leaves that
+        # change per path, keyed in newest-first order like the original
+        # reverse replay.
+        undo = {}
+        for change in self.iter_task_changes(task_id, reverse=True):
+            if change['operation'] == 'create' or change['before_content'] is not None:
+                undo[change['file_path']] = change
 
         files_restored = []
         files_deleted = []
         errors = []
 
-        # Apply changes in reverse order
-        for change in reversed(changes):
-            file_path = Path(change['file_path'])
-
-            try:
-                if change['operation'] == 'create':
-                    # Delete created file
-                    if file_path.exists():
-                        file_path.unlink()
-                        files_deleted.append(str(file_path))
-
-                elif change['operation'] == 'modify':
-                    # Restore previous content
-                    if change['before_content'] is not None:
-                        file_path.write_text(change['before_content'])
-                        files_restored.append(str(file_path))
-
-                elif change['operation'] == 'delete':
-                    # Restore deleted file
-                    if change['before_content'] is not None:
-                        file_path.parent.mkdir(parents=True, exist_ok=True)
-                        file_path.write_text(change['before_content'])
-                        files_restored.append(str(file_path))
-
-            except Exception as e:
-                errors.append(f"{file_path}: {str(e)}")
+        if not undo:
+            return {
+                'files_restored': files_restored,
+                'files_deleted': files_deleted,
+                'errors': errors
+            }
+
+        # Create missing parent directories once, before the parallel writes
+        for change in undo.values():
+            if change['operation'] != 'create':
+                try:
+                    Path(change['file_path']).parent.mkdir(parents=True, exist_ok=True)
+                except OSError:
+                    pass  # Reported by _undo_file_change when the write fails
+
+        # Each path appears once, so the undo operations are independent
+        with ThreadPoolExecutor(max_workers=min(32, len(undo))) as executor:
+            futures = [executor.submit(self._undo_file_change, change)
+                       for change in undo.values()]
+
+            for change, future in zip(undo.values(), futures):
+                file_path = str(Path(change['file_path']))
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    errors.append(f"{file_path}: {str(e)}")
+                    continue
+
+                if outcome == 'deleted':
+                    files_deleted.append(file_path)
+                elif outcome == 'restored':
+                    files_restored.append(file_path)
 
         return {
             'files_restored': files_restored,
@@ -1199,6 +2360,22 @@ class TaskQueue:
             'errors': errors
         }
 
+    @staticmethod
+    def _undo_file_change(change: Dict) -> Optional[str]:
+        """Revert one tracked change; returns 'deleted', 'restored' or None"""
+        file_path = Path(change['file_path'])
+
+        if change['operation'] == 'create':
+            # Delete created file
+            if file_path.exists():
+                file_path.unlink()
+                return 'deleted'
+            return None
+
+        # modify / delete: restore previous content
+        file_path.write_bytes(change['before_content'].encode())
+        return 'restored'
+
     # Retry logic API
 
     def should_retry_task(self, task_id: int) -> bool:
@@ -1211,16 +2388,11 @@ class TaskQueue:
         Returns:
             True if task should be retried, False otherwise
         """
-        conn = self._get_conn()
-        cursor = conn.execute("""
-            SELECT retry_count, max_retries FROM tasks WHERE id = ?
-        """, (task_id,))
-        row = cursor.fetchone()
-
-        if not row:
-            return False
-
-        return row['retry_count'] < row['max_retries']
+        with self._reader() as conn:
+            row = _tuple_cursor(conn).execute(
+                "SELECT retry_count < max_retries FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+            return bool(row and row[0])
 
     def increment_retry_count(self, task_id: int, error_message: str):
         """
@@ -1230,14 +2402,13 @@ class TaskQueue:
             task_id: Task ID
             error_message: Error message from failed attempt
         """
-        conn = self._get_conn()
-        conn.execute("""
-            UPDATE tasks
-            SET retry_count = retry_count + 1,
-                last_error = ?
-            WHERE id = ?
-        """, (error_message, task_id))
-        conn.commit()
+        with self._writer() as conn:
+            conn.execute("""
+                UPDATE tasks
+                SET retry_count = retry_count + 1,
+                    last_error = ?
+                WHERE id = ?
+            """, (error_message, task_id))
 
     def retry_task(self, task_id: int, include_error_context: bool = True) -> Optional[int]:
         """
@@ -1263,39 +2434,44 @@ class TaskQueue:
         if not self.should_retry_task(task_id):
             return None
 
-        conn = self._get_conn()
-        cursor = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        task = cursor.fetchone()
+        with self._writer() as conn:
+            cursor = conn.execute(
+                "SELECT prompt, last_error FROM tasks WHERE id = ?", (task_id,)
+            )
+            task = cursor.fetchone()
 
-        if not task:
-            return None
+            if not task:
+                return None
 
-        # Build retry prompt with error context
-        retry_prompt = task['prompt']
-        if include_error_context and task['last_error']:
-            retry_prompt = f"""Previous attempt failed with error:
-{task['last_error']}
+            # Build retry prompt with error context
+            retry_prompt = task['prompt']
+            if include_error_context:
+                retry_prompt = self._build_retry_prompt(task['prompt'], task['last_error'])
 
-Please fix the issue and complete the task:
-{task['prompt']}"""
+            # Reset task to pending with updated prompt
+            conn.execute("""
+                UPDATE tasks
+                SET status = 'pending',
+                    prompt = ?,
+                    worker_id = NULL,
+                    claimed_at = NULL,
+                    started_at = NULL,
+                    error = NULL
+                WHERE id = ?
+            """, (retry_prompt, task_id))
 
-        # Reset task to pending with updated prompt
-        conn.execute("""
-            UPDATE tasks
-            SET status = 'pending',
-                prompt = ?,
-                worker_id = NULL,
-                claimed_at = NULL,
-                started_at = NULL,
-                error = NULL
-            WHERE id = ?
-        """, (retry_prompt, task_id))
-
-        # Increment retry count
-        self.increment_retry_count(task_id, task['last_error'] or "Unknown error")
-
-        conn.commit()
-        return task_id
+            # Increment retry count
+            self.increment_retry_count(task_id, task['last_error'] or "Unknown error")
+
+            return task_id
+
+    @staticmethod
+    def _build_retry_prompt(prompt: str, error: Optional[str]) -> str:
+        """Prefix a task prompt with the error from its previous attempt"""
+        if not error:
+            return prompt
+
+        return _RETRY_PROMPT_TEMPLATE.format_map({'error': error, 'prompt': prompt})
 
     def get_failed_retryable_tasks(self, job_id: Optional[str] = None) -> List[Dict]:
         """
@@ -1307,25 +2483,22 @@ Please fix the issue and complete the task:
         Returns:
             List of failed task dictionaries that have retries remaining
         """
-        conn = self._get_conn()
+        return self._select_failed_retryable("*", job_id)
 
-        if job_id:
-            cursor = conn.execute("""
-                SELECT * FROM tasks
-                WHERE status = 'failed'
-                  AND job_id = ?
-                  AND retry_count < max_retries
-                ORDER BY priority DESC, created_at ASC
-            """, (job_id,))
-        else:
-            cursor = conn.execute("""
-                SELECT * FROM tasks
+    def _select_failed_retryable(self, columns: str, job_id: Optional[str]) -> List[Dict]:
+        """Fetch the given columns of retryable failed tasks, in retry order"""
+        job_filter = "AND job_id = ?" if job_id else ""
+        params = (job_id,) if job_id else ()
+
+        with self._reader() as conn:
+            cursor = conn.execute(f"""
+                SELECT {columns} FROM tasks
                 WHERE status = 'failed'
+                  {job_filter}
                   AND retry_count < max_retries
                 ORDER BY priority DESC, created_at ASC
-            """)
-
-        return [dict(row) for row in cursor.fetchall()]
+            """, params)
+            return _rows_to_dicts(cursor)
 
     def retry_all_failed_tasks(self, job_id: Optional[str] = None) -> List[int]:
         """
@@ -1337,15 +2510,20 @@ Please fix the issue and complete the task:
         Returns:
             List of task IDs that were retried
         """
-        failed_tasks = self.get_failed_retryable_tasks(job_id)
-        retried_ids = []
+        sql = _SQL_RETRY_FAILED_TASKS.format(
+            job_filter="AND job_id = :job_id" if job_id else ""
+        )
 
-        for task in failed_tasks:
-            task_id = self.retry_task(task['id'], include_error_context=True)
-            if task_id:
-                retried_ids.append(task_id)
+        with self._writer() as conn:
+            rows = _tuple_cursor(conn).execute(sql, {
+                'before_error': _RETRY_BEFORE_ERROR,
+                'before_prompt': _RETRY_BEFORE_PROMPT,
+                'job_id': job_id,
+            }).fetchall()
 
-        return retried_ids
+        # RETURNING order is unspecified; report IDs in retry (claim) order
+        rows.sort(key=lambda row: (-row[1], row[2]))
+        return [row[0] for row in rows]
 
     def get_shared_context(self, job_id: Optional[str] = None) -> Dict[str, str]:
         """
@@ -1371,26 +2549,24 @@ Please fix the issue and complete the task:
             Job-specific context includes both job-scoped and global contexts,
             with job-scoped values taking precedence.
         """
-        conn = self._get_conn()
-
-        # Get global context
-        cursor = conn.execute("""
-            SELECT key, value FROM shared_context
-            WHERE job_id IS NULL
-            ORDER BY updated_at
-        """)
-        context = {row['key']: row['value'] for row in cursor.fetchall()}
-
-        # Overlay job-specific context if job_id provided
-        if job_id:
-            cursor = conn.execute("""
-                SELECT key, value FROM shared_context
-                WHERE job_id = ?
-                ORDER BY updated_at
-            """, (job_id,))
-            context.update({row['key']: row['value'] for row in cursor.fetchall()})
-
-        return context
+        with self._reader() as conn:
+
+            if job_id:
+                # Global rows first, then job rows, so job values win in the dict
+                cursor = conn.execute("""
+                    SELECT key, value FROM shared_context
+                    WHERE job_id IS NULL OR job_id = ?
+                    ORDER BY (job_id IS NULL) DESC, updated_at
+                """, (job_id,))
+            else:
+                cursor = conn.execute("""
+                    SELECT key, value FROM shared_context
+                    WHERE job_id IS NULL
+                    ORDER BY updated_at
+                """)
+
+            context = {row['key']: row['value'] for row in cursor.fetchall()}
+            return context
 
     def delete_shared_context(self, key: str, job_id: Optional[str] = None):
         """
@@ -1400,12 +2576,11 @@ Please fix the issue and complete the task:
             key: Context key to delete
             job_id: Optional job ID to scope deletion (None for global)
         """
-        conn = self._get_conn()
-        conn.execute("""
-            DELETE FROM shared_context
-            WHERE key = ? AND job_id IS ?
-        """, (key, job_id))
-        conn.commit()
+        with self._writer() as conn:
+            conn.execute("""
+                DELETE FROM shared_context
+                WHERE key = ? AND job_id IS ?
+            """, (key, job_id))
 
     # Task Dependencies API
 
@@ -1427,22 +2602,11 @@ Please fix the issue and complete the task:
             # Worker will not claim task 2 until task 1 is completed
             ```
         """
-        # Check for circular dependencies
-        if self._has_circular_dependency(task_id, depends_on_task_id):
-            raise ValueError(
-                f"Circular dependency detected: task {task_id} -> {depends_on_task_id}"
-            )
-
-        conn = self._get_conn()
-        try:
-            conn.execute("""
-                INSERT INTO task_dependencies (task_id, depends_on_task_id)
-                VALUES (?, ?)
-            """, (task_id, depends_on_task_id))
-            conn.commit()
-        except sqlite3.IntegrityError:
-            # Dependency already exists, ignore
-            pass
+        # Checked under the write lock, so no concurrent edge can slip in
+        # between the cycle check and the insert
+        with self._writer() as conn:
+            self._check_dependency(conn, task_id, depends_on_task_id)
+            conn.execute(_SQL_INSERT_DEPENDENCY, (task_id, depends_on_task_id))
 
     def get_task_dependencies(self, task_id: int) -> List[int]:
         """
@@ -1460,12 +2624,12 @@ Please fix the issue and complete the task:
             # [1, 2, 3] - task 5 depends on tasks 1, 2, and 3
             ```
         """
-        conn = self._get_conn()
-        cursor = conn.execute("""
-            SELECT depends_on_task_id FROM task_dependencies
-            WHERE task_id = ?
-        """, (task_id,))
-        return [row['depends_on_task_id'] for row in cursor.fetchall()]
+        with self._reader() as conn:
+            cursor = conn.execute("""
+                SELECT depends_on_task_id FROM task_dependencies
+                WHERE task_id = ?
+            """, (task_id,))
+            return [row['depends_on_task_id'] for row in cursor.fetchall()]
 
     def are_dependencies_met(self, task_id: int) -> bool:
         """
@@ -1477,6 +2641,10 @@ Please fix the issue and complete the task:
         Returns:
             True if all dependencies are completed, False otherwise
 
+        Note:
+            claim_task() does this check inside its candidate query and does
+            not call this method; it is kept for external callers.
+
         Example:
             ```python
             if queue.are_dependencies_met(task_id=5):
@@ -1484,58 +2652,134 @@ Please fix the issue and complete the task:
                 task = queue.claim_task(worker_id)
             ```
         """
-        conn = self._get_conn()
-        cursor = conn.execute("""
-            SELECT COUNT(*) as unmet_count
-            FROM task_dependencies td
-            JOIN tasks t ON td.depends_on_task_id = t.id
-            WHERE td.task_id = ?
-              AND t.status NOT IN ('completed', 'cancelled')
-        """, (task_id,))
-        result = cursor.fetchone()
-        return result['unmet_count'] == 0
+        with self._reader() as conn:
+            cursor = conn.execute("""
+                SELECT COUNT(*) as unmet_count
+                FROM task_dependencies td
+                JOIN tasks t ON td.depends_on_task_id = t.id
+                WHERE td.task_id = ?
+                  AND t.status NOT IN ('completed', 'cancelled')
+            """, (task_id,))
+            result = cursor.fetchone()
+            return result['unmet_count'] == 0
 
-    def _has_circular_dependency(self, task_id: int, depends_on_task_id: int) -> bool:
+    def get_ready_pending_tasks(self, limit: int = 10) -> List[Dict]:
         """
-        Check if adding a dependency would create a cycle
+        Get pending tasks whose dependencies are all met, in claim order
+
+        Uses a single query instead of calling are_dependencies_met() per task.
 
         Args:
-            task_id: Task to add dependency to
-            depends_on_task_id: Task it would depend on
+            limit: Maximum number of tasks to return
 
         Returns:
-            True if this would create a circular dependency
+            List of task dictionaries, highest priority first
+        """
+        with self._reader() as conn:
+            cursor = conn.execute(_SQL_READY_PENDING, (limit,))
+            return _rows_to_dicts(cursor)
 
-        Implementation:
-            Uses depth-first search to detect cycles
+    @staticmethod
+    def _check_dependency(conn: sqlite3.Connection, task_id: int, depends_on_task_id: int):
         """
-        # If depends_on_task_id already depends on task_id (directly or indirectly),
-        # adding task_id -> depends_on_task_id would create a cycle
+        Raise ValueError if adding task_id -> depends_on_task_id would create a cycle
 
-        visited = set()
-        stack = [depends_on_task_id]
+        Runs on the writer connection inside the transaction that inserts the
+        edge. A cycle exists if depends_on_task_id already depends on task_id,
+        directly or indirectly (one recursive CTE walk).
+        """
+        if conn.execute(_SQL_DEPENDENCY_REACHES, (depends_on_task_id, task_id)).fetchone():
+            raise ValueError(
+                f"Circular dependency detected: task {task_id} -> {depends_on_task_id}"
+            )
 
-        conn = self._get_conn()
 
-        while stack:
-            current = stack.pop()
+class AsyncTaskQueue:
+    """
+    asyncio wrapper around TaskQueue
+
+    Every public TaskQueue method is available as a coroutine that runs the
+    blocking SQLite call on a worker thread, so the event loop never waits on
+    a query or fsync. Writes go through a single-thread executor (matching
+    the one writer connection); reads use an executor sized to the read pool,
+    and the blocking wait_* methods get their own executor so a pending wait
+    never holds up reads or writes. The iter_* generators are not wrapped
+    (they would be consumed on the event loop); use the list-returning
+    equivalents (list_tasks, get_all_tasks, get_task_changes).
+
+    Example:
+        ```python
+        aqueue = AsyncTaskQueue("claude_tasks.db")
+        task_id = await aqueue.add_task("Write tests", priority=5)
+        task = await aqueue.get_task(task_id)
+        aqueue.close()
+        ```
+    """
+
+    # Methods safe to run concurrently on the reader pool
+    _READ_PREFIXES = ('get_', 'list_', 'are_', 'should_', 'count_')
+    # Methods that block until something happens (wait_for_change, ...)
+    _WAIT_PREFIX = 'wait_'
+    # Max wait_* calls blocking at once; further waits queue behind them
+    _MAX_WAITERS = 32
+
+    def __init__(self, db_path: str = "claude_tasks.db", read_pool_size: int = 4,
+                 task_queue: Optional[TaskQueue] = None):
+        # Only close the TaskQueue on close() if this wrapper created it
+        self._owns_queue = task_queue is None
+        self.queue = task_queue or TaskQueue(db_path, read_pool_size=read_pool_size)
+        self._write_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="taskqueue-write"
+        )
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=self.queue._read_pool_size, thread_name_prefix="taskqueue-read"
+        )
+        self._wait_executor = ThreadPoolExecutor(
+            max_workers=self._MAX_WAITERS, thread_name_prefix="taskqueue-wait"
+        )
 
-            if current == task_id:
-                # Found a path back to task_id - circular dependency
-                return True
+    def __getattr__(self, name: str):
+        method = getattr(self.queue, name)
+        if name.startswith('_') or not callable(method):
+            return method
 
-            if current in visited:
-                continue
+        if name.startswith('iter_'):
+            raise AttributeError(
+                f"AsyncTaskQueue does not wrap {name}(): the generator would be "
+                f"consumed on the event loop; use the list-returning equivalent "
+                f"(list_tasks, get_all_tasks, get_task_changes)"
+            )
 
-            visited.add(current)
+        if name.startswith(self._WAIT_PREFIX):
+            executor = self._wait_executor
+        elif name.startswith(self._READ_PREFIXES) and name != 'get_connection':
+            executor = self._read_executor
+        else:
+            executor = self._write_executor
+
+        async def call(*args, **kwargs):
+            # Imported here: asyncio is most of claude_queue's import time, and
+            # workers and the CLI tools never use AsyncTaskQueue. By the time
+            # a coroutine runs, the caller has already loaded it.
+            import asyncio
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                executor, functools.partial(method, *args, **kwargs)
+            )
 
-            # Get all tasks that current depends on
-            cursor = conn.execute("""
-                SELECT depends_on_task_id FROM task_dependencies
-                WHERE task_id = ?
-            """, (current,))
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
 
-            for row in cursor.fetchall():
-                stack.append(row['depends_on_task_id'])
+    def close(self):
+        """
+        Shut down the worker threads
 
-        return False
+        Waits for queued reads and writes to finish. Waits that haven't
+        started are cancelled; running ones end at their own timeout.
+        """
+        self._wait_executor.shutdown(wait=False, cancel_futures=True)
+        self._write_executor.shutdown(wait=True)
+        self._read_executor.shutdown(wait=True)
+        if self._owns_queue:
+            self.queue.close()
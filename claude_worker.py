@@ -7,12 +7,16 @@ Executes tasks from the queue using Claude Code CLI
 import os
 import sys
 import time
+import random
 import json
 import subprocess
-import tempfile
+import shutil
 import threading
+import queue
+import functools
+from collections import deque
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 import signal
 
 from claude_queue import TaskQueue
@@ -24,7 +28,57 @@ from verification import (
     format_verification_error
 )
 
+
+@functools.lru_cache(maxsize=32)
+def _detect_verification(working_dir: str, dir_mtime_ns: int,
+                         package_json_mtime_ns: int) -> Tuple[tuple, tuple]:
+    """Detect project types and default hooks; the mtimes are only part of the cache key"""
+    project_types = ProjectTypeDetector.detect_project_types(working_dir)
+    hooks = ProjectTypeDetector.get_default_hooks(project_types, working_dir) if project_types else []
+    return tuple(project_types), tuple(hooks)
+
+
+def _default_verification(working_dir: str) -> Tuple[list, list]:
+    """
+    Cached project type detection and default hooks for a working directory
+
+    Marker files being added or removed changes the directory's mtime, and
+    package.json is stat'ed as well because React detection and the npm test
+    hook depend on its contents.
+
+    Returns:
+        Tuple of (project_types, default_hooks)
+    """
+    try:
+        dir_mtime_ns = os.stat(working_dir).st_mtime_ns
+    except OSError:
+        return [], []
+    try:
+        package_json_mtime_ns = os.stat(os.path.join(working_dir, 'package.json')).st_mtime_ns
+    except OSError:
+        package_json_mtime_ns = 0
+    project_types, hooks = _detect_verification(working_dir, dir_mtime_ns, package_json_mtime_ns)
+    return list(project_types), list(hooks)
+
 class ClaudeWorker:
+    # Characters of CLI stdout/stderr kept per task (the tail, if it prints more)
+    _OUTPUT_TAIL_CHARS = 1024 * 1024
+
+    # Seconds a CLI run may take before its process group is killed
+    _CLI_TIMEOUT = 30 * 60
+    # Seconds to wait for the output readers once the CLI has exited; a
+    # background process the CLI left running can hold its pipes open
+    _READER_JOIN_TIMEOUT = 5
+
+    # Heartbeats and progress logs queued for the activity writer thread
+    _ACTIVITY_QUEUE_SIZE = 1000
+
+    # Idle polling backs off from the minimum to the maximum delay (seconds)
+    # while the queue stays empty, and resets after a successful claim
+    _IDLE_DELAY_MIN = 0.25
+    _IDLE_DELAY_MAX = 8.0
+    _ERROR_DELAY = 5.0
+
     def __init__(self, worker_id: str, db_path: Optional[str] = None, config: Optional[Config] = None):
         """
         Initialize worker
@@ -54,24 +108,132 @@ class ClaudeWorker:
         self.running = True
         self.heartbeat_thread = None
 
+        # Heartbeats and progress logs waiting for the activity writer thread
+        self._activity_queue: "queue.Queue[Optional[tuple]]" = queue.Queue(
+            maxsize=self._ACTIVITY_QUEUE_SIZE
+        )
+        self._activity_writer_thread = None
+
+        # Resolve the CLI once instead of a PATH search on every task spawn
+        # (None if it is not installed; startup_health_check reports that)
+        self.claude_bin = shutil.which('claude')
+
+        # Set on shutdown so idle and error waits return immediately
+        self._wake = threading.Event()
+
+        # Working directory for tasks that don't set one; the worker never chdirs
+        self._default_cwd = os.getcwd()
+
+        # TaskVerifier per working directory, reused across tasks
+        self._verifiers: Dict[str, TaskVerifier] = {}
+
     def start_heartbeat(self):
-        """Start heartbeat thread"""
+        """
+        Start heartbeat threads
+
+        The heartbeat thread only queues (status, task_id) updates; the
+        activity writer thread sends them to the database along with queued
+        progress logs, so a slow write (e.g. during a WAL checkpoint) never
+        delays the next heartbeat.
+        """
+        interval = self.config.workers.heartbeat_interval
+        # An unchanged heartbeat is skipped, but never for so long that
+        # cleanup_stale_tasks() could mistake this worker for a dead one
+        max_quiet = self.config.workers.stale_timeout / 2
+
         def heartbeat():
+            last_sent = None
+            last_sent_at = 0.0
             while self.running:
+                status = 'active' if self.current_task_id else 'idle'
+                current = (status, self.current_task_id)
+                if current != last_sent or time.monotonic() - last_sent_at >= max_quiet:
+                    try:
+                        self._activity_queue.put_nowait(('heartbeat', current))
+                        last_sent = current
+                        last_sent_at = time.monotonic()
+                    except queue.Full:
+                        # Writer is behind; retry on the next beat
+                        pass
+
+                # +/-20% jitter so workers started together don't write in lockstep
+                if self._wake.wait(interval * random.uniform(0.8, 1.2)):
+                    break
+
+            # Let the writer finish what is queued, then exit
+            self._activity_queue.put(None)
+
+        self._activity_writer_thread = threading.Thread(
+            target=self._activity_writer_loop, daemon=True
+        )
+        self._activity_writer_thread.start()
+        self.heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+        self.heartbeat_thread.start()
+
+    def _activity_writer_loop(self):
+        """
+        Write queued progress logs and heartbeats
+
+        Everything queued since the last wake-up is written together: all
+        logs in one batch, and only the newest heartbeat.
+        """
+        while True:
+            item = self._activity_queue.get()
+            stopping = item is None
+            logs = []
+            heartbeat = None
+
+            while item is not None:
+                kind, payload = item
+                if kind == 'log':
+                    logs.append(payload)
+                else:
+                    heartbeat = payload
+
+                try:
+                    item = self._activity_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+
+            if logs:
+                try:
+                    self.queue.log_worker_progress_bulk(logs)
+                except Exception as e:
+                    # Don't fail the task if logging fails
+                    print(f"[{self.worker_id}] [WARNING] Failed to log progress: {e}", file=sys.stderr)
+
+            if heartbeat is not None:
+                status, task_id = heartbeat
                 try:
-                    status = 'active' if self.current_task_id else 'idle'
-                    self.queue.update_worker_heartbeat(
-                        self.worker_id, status, self.current_task_id
-                    )
+                    self.queue.update_worker_heartbeat(self.worker_id, status, task_id)
                 except Exception as e:
                     print(f"[{self.worker_id}] Heartbeat error: {e}", file=sys.stderr)
-                time.sleep(5)
 
-        self.heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
-        self.heartbeat_thread.start()
+            if stopping:
+                return
+
+    def stop_heartbeat(self):
+        """Stop the heartbeat threads after queued heartbeats and logs are written"""
+        self._wake.set()
+        for thread in (self.heartbeat_thread, self._activity_writer_thread):
+            if thread is not None:
+                thread.join(timeout=10)
 
     def log_progress(self, message: str, task_id: Optional[int] = None, level: str = 'info'):
         """Log progress message to database for real-time visibility"""
+        writer = self._activity_writer_thread
+        if writer is not None and writer.is_alive():
+            # Written in a batch by the activity writer thread
+            self._activity_queue.put(('log', {
+                'worker_id': self.worker_id,
+                'message': message,
+                'task_id': task_id,
+                'level': level,
+            }))
+            return
+
         try:
             self.queue.log_worker_progress(self.worker_id, message, task_id, level)
         except Exception as e:
@@ -82,7 +244,7 @@ class ClaudeWorker:
         """Execute a task using Claude Code"""
         task_id = task['id']
         prompt = task['prompt']
-        working_dir = task['working_dir'] or os.getcwd()
+        working_dir = task['working_dir'] or self._default_cwd
         context_files = json.loads(task['context_files']) if task['context_files'] else []
         expected_outputs = json.loads(task['expected_outputs']) if task['expected_outputs'] else []
 
@@ -92,14 +254,20 @@ class ClaudeWorker:
         verification_hooks = [VerificationHook.from_dict(h) for h in verification_hooks_data]
         auto_verify = metadata.get('auto_verify', True)  # Auto-detect and verify by default
 
-        print(f"[{self.worker_id}] Executing task {task_id}: {prompt[:50]}...")
-        self.log_progress(f"Executing: {prompt[:60]}...", task_id=task_id)
+        # run() already printed and logged the claim with a prompt preview;
+        # repeat it here (one more progress log write) only when asked to
+        if self.config.monitoring.detailed_logging:
+            preview = task.get('preview')
+            if preview is None:
+                preview = prompt[:60] + "..." if len(prompt) > 60 else prompt
+            print(f"[{self.worker_id}] Executing task {task_id}: {preview}")
+            self.log_progress(f"Executing: {preview}", task_id=task_id)
 
         # Get job_id for shared context
         job_id = task.get('job_id')
 
-        # Build comprehensive prompt with context
-        full_prompt = f"Task ID: {task_id}\n\n"
+        # Build comprehensive prompt with context (joined once at the end)
+        parts = [f"Task ID: {task_id}\n\n"]
 
         # Inject shared context for worker coordination
         if job_id:
@@ -108,57 +276,47 @@ class ClaudeWorker:
             shared_context = self.queue.get_shared_context()
 
         if shared_context:
-            full_prompt += "Project Conventions (follow these):\n"
-            for key, value in shared_context.items():
-                full_prompt += f"- {key}: {value}\n"
-            full_prompt += "\n"
+            parts.append("Project Conventions (follow these):\n")
+            parts.extend(f"- {key}: {value}\n" for key, value in shared_context.items())
+            parts.append("\n")
 
         if context_files:
-            full_prompt += "Context files to review:\n"
-            for file_path in context_files:
-                full_prompt += f"- {file_path}\n"
-            full_prompt += "\n"
+            parts.append("Context files to review:\n")
+            parts.extend(f"- {file_path}\n" for file_path in context_files)
+            parts.append("\n")
 
         if expected_outputs:
-            full_prompt += "Expected outputs:\n"
-            for output in expected_outputs:
-                full_prompt += f"- {output}\n"
-            full_prompt += "\n"
+            parts.append("Expected outputs:\n")
+            parts.extend(f"- {output}\n" for output in expected_outputs)
+            parts.append("\n")
 
-        full_prompt += f"Task:\n{prompt}\n\n"
-        full_prompt += "Please complete this task. When done, respond with 'TASK_COMPLETE'."
+        parts.append(f"Task:\n{prompt}\n\n")
+        parts.append("Please complete this task. When done, respond with 'TASK_COMPLETE'.")
+        full_prompt = "".join(parts)
 
         try:
-            # Execute Claude Code using -p flag for non-interactive mode
-            # Use bypassPermissions mode to allow autonomous tool execution
-            # Pass prompt via stdin to handle long prompts properly
-            result = subprocess.run(
-                ['claude', '-p', '--permission-mode', 'bypassPermissions'],
-                input=full_prompt,
-                cwd=working_dir,
-                capture_output=True,
-                text=True,
-                timeout=1800  # 30 minute timeout
-            )
+            return_code, stdout, stderr = self._run_claude(full_prompt, working_dir, task_id)
 
             # Parse results
             output = {
-                'stdout': result.stdout,
-                'stderr': result.stderr,
-                'return_code': result.returncode,
+                'stdout': stdout,
+                'stderr': stderr,
+                'return_code': return_code,
                 'working_dir': working_dir
             }
 
             # Validate exit code (Issue #11 fix)
-            if result.returncode != 0:
-                error_msg = f"Claude CLI exited with code {result.returncode}"
-                if result.stderr:
-                    error_msg += f": {result.stderr.strip()}"
+            if return_code != 0:
+                error_msg = f"Claude CLI exited with code {return_code}"
+                if stderr:
+                    error_msg += f": {stderr.strip()}"
                 output['error'] = error_msg
                 return output
 
-            # Initialize verifier
-            verifier = TaskVerifier(working_dir)
+            # Verifiers only hold the working directory; reuse one per directory
+            verifier = self._verifiers.get(working_dir)
+            if verifier is None:
+                verifier = self._verifiers[working_dir] = TaskVerifier(working_dir)
 
             # Check for expected output files
             missing_files = []
@@ -175,10 +333,10 @@ class ClaudeWorker:
             # Auto-detect verification hooks if enabled and none provided
             if auto_verify and not verification_hooks:
                 print(f"[{self.worker_id}] [VERIFY] Auto-detecting project type...")
-                project_types = ProjectTypeDetector.detect_project_types(working_dir)
+                project_types, default_hooks = _default_verification(working_dir)
                 if project_types:
                     print(f"[{self.worker_id}] [VERIFY] Detected project types: {', '.join(project_types)}")
-                    verification_hooks = ProjectTypeDetector.get_default_hooks(project_types, working_dir)
+                    verification_hooks = default_hooks
                     if verification_hooks:
                         print(f"[{self.worker_id}] [VERIFY] Using {len(verification_hooks)} auto-detected hooks")
 
@@ -213,6 +371,112 @@ class ClaudeWorker:
                 'exception_type': type(e).__name__
             }
 
+    def _run_claude(self, full_prompt: str, working_dir: str,
+                    task_id: Optional[int] = None) -> Tuple[int, str, str]:
+        """
+        Run the Claude CLI on a prompt, keeping only the tail of its output
+
+        With detailed logging enabled, each stdout line is also logged as
+        task progress while the CLI runs.
+
+        Returns:
+            (return code, stdout tail, stderr tail)
+
+        Raises:
+            subprocess.TimeoutExpired: If the CLI runs longer than _CLI_TIMEOUT
+                (its whole process group is killed first)
+        """
+        # Execute Claude Code using -p flag for non-interactive mode
+        # Use bypassPermissions mode to allow autonomous tool execution
+        # Pass prompt via stdin to handle long prompts properly
+        # Own session so a timeout also kills anything the CLI started
+        proc = subprocess.Popen(
+            [self.claude_bin or 'claude', '-p', '--permission-mode', 'bypassPermissions'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=working_dir,
+            text=True,
+            start_new_session=True
+        )
+
+        # Drain both pipes as the CLI writes so it never blocks on a full
+        # pipe, holding about the last _OUTPUT_TAIL_CHARS of each. The prompt
+        # is written from a thread too, so a CLI that stalls without reading
+        # a large prompt is still bounded by the timeout below.
+        log_task_id = task_id if self.config.monitoring.detailed_logging else None
+        stdout_tail = deque()
+        stderr_tail = deque()
+        threads = [
+            threading.Thread(
+                target=self._drain_output, args=(proc.stdout, stdout_tail, log_task_id),
+                daemon=True
+            ),
+            threading.Thread(
+                target=self._drain_output, args=(proc.stderr, stderr_tail, None),
+                daemon=True
+            ),
+            threading.Thread(
+                target=self._write_input, args=(proc.stdin, full_prompt),
+                daemon=True
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            return_code = proc.wait(timeout=self._CLI_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self._kill_process_group(proc)
+            proc.wait()
+            raise
+        finally:
+            # Background processes the CLI left running keep its pipes open;
+            # don't wait on them. Abandoned threads close their pipe at EOF.
+            deadline = time.monotonic() + self._READER_JOIN_TIMEOUT
+            for thread in threads:
+                thread.join(timeout=max(0, deadline - time.monotonic()))
+
+        return return_code, ''.join(stdout_tail), ''.join(stderr_tail)
+
+    @staticmethod
+    def _write_input(pipe, text: str):
+        """Write the prompt to the CLI's stdin and close it"""
+        try:
+            with pipe:
+                pipe.write(text)
+        except OSError:
+            # CLI exited (or was killed) without reading all of its input
+            # (BrokenPipeError); the exit code says why
+            pass
+
+    @staticmethod
+    def _kill_process_group(proc: subprocess.Popen):
+        """Kill the CLI and every process in its session"""
+        if hasattr(os, 'killpg'):
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+                return
+            except (ProcessLookupError, PermissionError):
+                pass
+        proc.kill()
+
+    def _drain_output(self, pipe, tail: deque, log_task_id: Optional[int]):
+        """Read a CLI output pipe to EOF and close it, keeping the last _OUTPUT_TAIL_CHARS in tail"""
+        limit = self._OUTPUT_TAIL_CHARS
+        size = 0
+        with pipe:
+            for line in pipe:
+                if log_task_id is not None:
+                    self.log_progress(line.rstrip(), task_id=log_task_id)
+
+                if len(line) > limit:
+                    line = line[-limit:]
+                tail.append(line)
+                size += len(line)
+                while size > limit:
+                    size -= len(tail.popleft())
+
     def startup_health_check(self):
         """Validate worker configuration before starting task loop"""
         print(f"[{self.worker_id}] [STARTUP] Performing health check...")
@@ -238,18 +502,22 @@ class ClaudeWorker:
 
         # 3. Test database connection
         try:
-            self.queue._get_conn().execute("SELECT 1")
+            journal_mode = self.queue._get_conn().execute("PRAGMA journal_mode").fetchone()[0]
             print(f"[{self.worker_id}] [CONFIG] ✅ Database connection successful")
+            print(f"[{self.worker_id}] [CONFIG] Journal mode: {journal_mode}")
+            if journal_mode != 'wal':
+                print(f"[{self.worker_id}] [WARNING] ⚠️  Database is not in WAL mode; "
+                      f"heartbeats and claims will contend with readers")
         except Exception as e:
             print(f"[{self.worker_id}] [ERROR] ❌ Cannot connect to database: {e}")
             sys.exit(1)
 
         # 4. Check for pending tasks
         try:
-            pending = self.queue.list_tasks(status='pending')
-            print(f"[{self.worker_id}] [CONFIG] Pending tasks visible: {len(pending)}")
+            pending_count = self.queue.count_tasks(status='pending')
+            print(f"[{self.worker_id}] [CONFIG] Pending tasks visible: {pending_count}")
 
-            if len(pending) == 0:
+            if pending_count == 0:
                 print(f"[{self.worker_id}] [WARNING] ⚠️  No pending tasks found")
                 print(f"[{self.worker_id}] [WARNING] Worker will wait for new tasks...")
             else:
@@ -258,8 +526,14 @@ class ClaudeWorker:
             print(f"[{self.worker_id}] [ERROR] ❌ Error checking tasks: {e}")
             sys.exit(1)
 
-        # 5. Log working directory
-        print(f"[{self.worker_id}] [CONFIG] Working directory: {os.getcwd()}")
+        # 5. Check the Claude CLI is installed
+        if not self.claude_bin:
+            print(f"[{self.worker_id}] [ERROR] ❌ Claude Code CLI ('claude') not found on PATH")
+            sys.exit(1)
+        print(f"[{self.worker_id}] [CONFIG] Claude CLI: {self.claude_bin}")
+
+        # 6. Log working directory
+        print(f"[{self.worker_id}] [CONFIG] Working directory: {self._default_cwd}")
 
         print(f"[{self.worker_id}] [STARTUP] ✅ Health check passed")
 
@@ -282,31 +556,37 @@ class ClaudeWorker:
         def shutdown(signum, frame):
             print(f"\n[{self.worker_id}] Shutting down...")
             self.running = False
+            self._wake.set()
 
         signal.signal(signal.SIGINT, shutdown)
         signal.signal(signal.SIGTERM, shutdown)
 
         # Main loop
+        idle_delay = self._IDLE_DELAY_MIN
         while self.running:
             try:
-                # Claim next task
-                task = self.queue.claim_task(self.worker_id)
+                # Claim next task and mark it in progress in one write
+                task = self.queue.claim_and_start_task(self.worker_id)
 
                 if not task:
-                    # No tasks available, wait a bit
-                    print(f"[{self.worker_id}] [IDLE] No tasks available, waiting...")
-                    time.sleep(2)
+                    # No tasks available, back off until one shows up
+                    if idle_delay == self._IDLE_DELAY_MIN:
+                        print(f"[{self.worker_id}] [IDLE] No tasks available, waiting...")
+                    self._wake.wait(idle_delay)
+                    idle_delay = min(idle_delay * 2, self._IDLE_DELAY_MAX)
                     continue
 
+                idle_delay = self._IDLE_DELAY_MIN
+
                 # Execute task
                 self.current_task_id = task['id']
-                task_preview = task['prompt'][:60] + "..." if len(task['prompt']) > 60 else task['prompt']
+                # Preview computed once; execute_task reuses it
+                prompt = task['prompt']
+                task['preview'] = task_preview = prompt[:60] + "..." if len(prompt) > 60 else prompt
                 print(f"[{self.worker_id}] [CLAIM] ✅ Claimed task {task['id']}")
                 print(f"[{self.worker_id}] [CLAIM] Prompt: {task_preview}")
                 self.log_progress(f"Claimed: {task_preview}", task_id=task['id'])
 
-                # Mark as in progress
-                self.queue.start_task(task['id'], self.worker_id)
                 print(f"[{self.worker_id}] [EXEC] Executing task {task['id']}...")
                 self.log_progress("Executing task with Claude CLI", task_id=task['id'])
 
@@ -340,8 +620,12 @@ class ClaudeWorker:
                     except:
                         pass
                     self.current_task_id = None
-                time.sleep(5)
+                self._wake.wait(self._ERROR_DELAY)
+
+        self.stop_heartbeat()
 
+        # Commit any queued file changes and release the database
+        self.queue.close()
         print(f"[{self.worker_id}] [SHUTDOWN] Worker stopped")
 
 
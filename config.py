@@ -6,24 +6,26 @@ Loads and merges TOML configuration with proper precedence
 
 import os
 import sys
+import copy
+import functools
 from pathlib import Path
 from typing import Dict, Any, Optional
 from dataclasses import dataclass, field
 
-# Try to import TOML parser (Python 3.11+ has tomllib built-in)
+# Try to import TOML parser (Python 3.11+ has tomllib built-in). _toml_load
+# takes a binary file object, like tomllib.load.
 try:
-    import tomllib
+    from tomllib import load as _toml_load
 except ImportError:
     try:
-        import tomli as tomllib
+        from tomli import load as _toml_load
     except ImportError:
         try:
-            import toml as tomllib_compat
-            # Wrap toml.load to match tomllib interface
-            class tomllib:
-                @staticmethod
-                def load(f):
-                    return tomllib_compat.load(f)
+            import toml as _toml
+
+            def _toml_load(f):
+                # toml parses text; config files are opened in binary mode
+                return _toml.loads(f.read().decode('utf-8'))
         except ImportError:
             print("Error: No TOML library found.", file=sys.stderr)
             print("", file=sys.stderr)
@@ -35,6 +37,13 @@ except ImportError:
             sys.exit(1)
 
 
+@functools.lru_cache(maxsize=8)
+def _parse_toml(path: str, mtime_ns: int, size: int) -> Dict:
+    """Parse a TOML file; mtime_ns and size are only part of the cache key"""
+    with open(path, 'rb') as f:
+        return _toml_load(f)
+
+
 class ProjectBoundaryError(Exception):
     """Raised when attempting to work outside project boundaries"""
     pass
@@ -68,7 +77,7 @@ class WorkersConfig:
     default_count: int = 4
     log_directory: str = "logs"
     restart_on_failure: bool = True
-    heartbeat_interval: int = 5
+    heartbeat_interval: int = 20
     stale_timeout: int = 3600
 
 
@@ -144,13 +153,20 @@ class Config:
     @staticmethod
     def find_klauss_dir(project_root: Path) -> Optional[Path]:
         """Find klauss directory (submodule or standalone)"""
+        # One directory listing answers both project-root checks
+        try:
+            with os.scandir(project_root) as it:
+                entries = {entry.name for entry in it}
+        except OSError:
+            entries = set()
+
         # Check for klauss submodule in project
         klauss_submodule = project_root / "klauss"
-        if klauss_submodule.exists() and (klauss_submodule / "orchestrator.py").exists():
+        if "klauss" in entries and (klauss_submodule / "orchestrator.py").exists():
             return klauss_submodule
 
         # Check if we're already in klauss directory
-        if (project_root / "orchestrator.py").exists():
+        if "orchestrator.py" in entries:
             return project_root
 
         # Check parent (for when klauss is standalone)
@@ -179,18 +195,12 @@ class Config:
         # Step 2: Load default config from klauss/config.defaults.toml
         default_config = {}
         if klauss_dir:
-            default_config_path = klauss_dir / "config.defaults.toml"
-            if default_config_path.exists():
-                with open(default_config_path, 'rb') as f:
-                    default_config = tomllib.load(f)
+            default_config = cls._load_toml(klauss_dir / "config.defaults.toml")
 
         # Step 3: Load project config from .klauss.toml
         project_config = {}
         if project_root:
-            project_config_path = project_root / ".klauss.toml"
-            if project_config_path.exists():
-                with open(project_config_path, 'rb') as f:
-                    project_config = tomllib.load(f)
+            project_config = cls._load_toml(project_root / ".klauss.toml")
 
         # Step 4: Merge configurations (defaults → project → overrides)
         merged = cls._deep_merge(default_config, project_config)
@@ -240,15 +250,41 @@ class Config:
 
         return config
 
+    @staticmethod
+    def _load_toml(path: Path) -> Dict:
+        """
+        Load a TOML file, or return {} if it does not exist
+
+        Parsed files are cached until their mtime or size changes, so
+        repeated Config.load() calls in one process (e.g. one per worker)
+        don't re-read and re-parse them. Returns a copy the caller may modify.
+        """
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return {}
+        return copy.deepcopy(_parse_toml(str(path), st.st_mtime_ns, st.st_size))
+
     @staticmethod
     def _deep_merge(base: Dict, override: Dict) -> Dict:
-        """Deep merge two dictionaries"""
-        result = base.copy()
-        for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = Config._deep_merge(result[key], value)
-            else:
-                result[key] = value
+        """
+        Deep merge two dictionaries
+
+        Neither input is modified. Only the dicts along overridden paths are
+        copied; untouched sub-dicts of base are shared with the result.
+        """
+        result = dict(base)
+        stack = [(result, override)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                current = target.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    # Copy before writing into it so base stays unchanged
+                    target[key] = dict(current)
+                    stack.append((target[key], value))
+                else:
+                    target[key] = value
         return result
 
     def get_absolute_path(self, path: str) -> Path:
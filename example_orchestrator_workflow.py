@@ -25,30 +25,17 @@ def example_1_simple_parallel():
     # Create job
     job = orch.create_job("Create utility functions for Python project")
 
-    # Decompose into parallel sub-tasks
-    orch.add_subtask(
-        job,
-        "Create a Python function to calculate factorial with type hints and docstring",
-        priority=5
-    )
-
-    orch.add_subtask(
-        job,
-        "Create a Python function to check if a number is prime with type hints and docstring",
-        priority=5
-    )
-
-    orch.add_subtask(
-        job,
-        "Create a Python function to generate Fibonacci sequence with type hints and docstring",
-        priority=5
-    )
-
-    orch.add_subtask(
-        job,
-        "Create a Python function for binary search with type hints and docstring",
-        priority=5
-    )
+    # Decompose into parallel sub-tasks (submitted in one batch)
+    orch.add_subtasks(job, [
+        {"prompt": "Create a Python function to calculate factorial with type hints and docstring",
+         "priority": 5},
+        {"prompt": "Create a Python function to check if a number is prime with type hints and docstring",
+         "priority": 5},
+        {"prompt": "Create a Python function to generate Fibonacci sequence with type hints and docstring",
+         "priority": 5},
+        {"prompt": "Create a Python function for binary search with type hints and docstring",
+         "priority": 5},
+    ])
 
     print("\n✓ All tasks submitted to queue")
     print("\nNow waiting for workers to complete tasks...")
@@ -188,26 +175,11 @@ def example_3_adaptive():
     # (In real usage, Claude would read the analysis results and decide)
     print("\nStep 2: Creating refactoring tasks based on analysis...")
 
-    orch.add_subtask(
-        job,
-        "Refactor authentication module to use async/await",
-        priority=8,
-        parent_task_id=analysis_task
-    )
-
-    orch.add_subtask(
-        job,
-        "Extract database queries into separate repository layer",
-        priority=8,
-        parent_task_id=analysis_task
-    )
-
-    orch.add_subtask(
-        job,
-        "Add error handling to API endpoints",
-        priority=7,
-        parent_task_id=analysis_task
-    )
+    orch.create_hierarchical_tasks(job, analysis_task, [
+        {"prompt": "Refactor authentication module to use async/await", "priority": 8},
+        {"prompt": "Extract database queries into separate repository layer", "priority": 8},
+        {"prompt": "Add error handling to API endpoints", "priority": 7},
+    ])
 
     # Step 3: Validation
     print("\nStep 3: Validation")
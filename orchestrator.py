@@ -5,7 +5,6 @@ Allows Claude Code instances to delegate work to worker pool
 """
 
 import uuid
-import json
 import time
 import subprocess
 import sys
@@ -381,7 +380,8 @@ class ClaudeOrchestrator:
                    retry_policy: Optional[Dict] = None,
                    depends_on: Optional[List[int]] = None,
                    verification_hooks: Optional[List[VerificationHook]] = None,
-                   auto_verify: bool = True) -> int:
+                   auto_verify: bool = True,
+                   use_cache: bool = False) -> int:
         """
         Add a sub-task to a job
 
@@ -400,12 +400,16 @@ class ClaudeOrchestrator:
             depends_on: List of task IDs this task depends on (will only be claimed when dependencies complete)
             verification_hooks: List of verification hooks to run after task completion
             auto_verify: Auto-detect project type and add verification hooks (default: True)
+            use_cache: Complete immediately with the result of an identical earlier
+                task if one is cached (default: False). Only for tasks whose outcome
+                doesn't depend on the current state of the working directory.
 
         Returns:
             Task ID
 
         Raises:
             ProjectBoundaryError: If working_dir is outside project and not allowed
+            ValueError: If a dependency would create a cycle (the task is not added)
 
         Example with retries:
             # Task will retry up to 2 times on failure
@@ -421,50 +425,94 @@ class ClaudeOrchestrator:
             task1 = orch.add_subtask(job, "Build authentication module")
             task2 = orch.add_subtask(job, "Write tests for authentication", depends_on=[task1])
         """
-        # Use default priority from config if not specified
-        if priority is None:
-            priority = self.config.defaults.priority
-
-        # Validate working directory
-        self.config.validate_working_dir(working_dir, allow_external)
-
-        # Prepare metadata with verification hooks
-        task_metadata = metadata.copy() if metadata else {}
-
-        # Add verification hooks to metadata
-        if verification_hooks:
-            task_metadata['verification_hooks'] = [h.to_dict() for h in verification_hooks]
-
-        # Set auto_verify flag
-        task_metadata['auto_verify'] = auto_verify
-
-        # Add task to queue
-        task_id = self.queue.add_task(
-            prompt=prompt,
-            working_dir=working_dir,
-            context_files=context_files,
-            expected_outputs=expected_outputs,
-            metadata=task_metadata,
-            priority=priority,
-            job_id=job_id,
-            parent_task_id=parent_task_id,
-            max_retries=max_retries,
-            retry_policy=retry_policy
-        )
-
-        # Add dependencies if specified
-        if depends_on:
-            for dep_task_id in depends_on:
-                try:
-                    self.queue.add_task_dependency(task_id, dep_task_id)
-                    print(f"  └─ Task {task_id} depends on Task {dep_task_id}")
-                except ValueError as e:
-                    # Circular dependency or other validation error
-                    print(f"  ⚠️  Warning: Could not add dependency {dep_task_id} -> {task_id}: {e}")
-
-        retry_info = f" (max {max_retries} retries)" if max_retries > 0 else ""
-        print(f"  └─ Task {task_id}: {prompt[:60]}...{retry_info}")
-        return task_id
+        return self.add_subtasks(job_id, [{
+            'prompt': prompt,
+            'working_dir': working_dir,
+            'context_files': context_files,
+            'expected_outputs': expected_outputs,
+            'priority': priority,
+            'parent_task_id': parent_task_id,
+            'metadata': metadata,
+            'allow_external': allow_external,
+            'max_retries': max_retries,
+            'retry_policy': retry_policy,
+            'depends_on': depends_on,
+            'verification_hooks': verification_hooks,
+            'auto_verify': auto_verify,
+            'use_cache': use_cache,
+        }])[0]
+
+    def add_subtasks(self, job_id: str, subtasks: List[Dict]) -> List[int]:
+        """
+        Add several sub-tasks to a job in a single queue transaction
+
+        The tasks and their depends_on edges are committed together, so a
+        worker never sees a dependent task without its dependencies.
+
+        Args:
+            job_id: Job ID to add tasks to
+            subtasks: List of dicts with the same keys as add_subtask's
+                arguments (prompt is required)
+
+        Returns:
+            Task IDs, in the same order as subtasks
+
+        Raises:
+            ProjectBoundaryError: If a working_dir is outside project and not allowed
+            ValueError: If a dependency would create a cycle (nothing is added)
+
+        Example:
+            task_ids = orch.add_subtasks(job, [
+                {"prompt": "Create Button component", "priority": 5},
+                {"prompt": "Create Input component", "max_retries": 2},
+            ])
+        """
+        # Validate everything before inserting anything
+        rows = []
+        for subtask in subtasks:
+            priority = subtask.get('priority')
+            if priority is None:
+                priority = self.config.defaults.priority
+
+            self.config.validate_working_dir(subtask.get('working_dir'),
+                                             subtask.get('allow_external', False))
+
+            # Prepare metadata with verification hooks
+            metadata = subtask.get('metadata')
+            task_metadata = metadata.copy() if metadata else {}
+            if subtask.get('verification_hooks'):
+                task_metadata['verification_hooks'] = [h.to_dict() for h in subtask['verification_hooks']]
+            task_metadata['auto_verify'] = subtask.get('auto_verify', True)
+
+            rows.append({
+                'prompt': subtask['prompt'],
+                'working_dir': subtask.get('working_dir'),
+                'context_files': subtask.get('context_files'),
+                'expected_outputs': subtask.get('expected_outputs'),
+                'metadata': task_metadata,
+                'priority': priority,
+                'job_id': job_id,
+                'parent_task_id': subtask.get('parent_task_id'),
+                'max_retries': subtask.get('max_retries', 0),
+                'retry_policy': subtask.get('retry_policy'),
+                'depends_on': subtask.get('depends_on'),
+                'use_result_cache': subtask.get('use_cache', False),
+            })
+
+        task_ids = self.queue.add_tasks(rows)
+
+        lines = []
+        for task_id, subtask in zip(task_ids, subtasks):
+            for dep_task_id in subtask.get('depends_on') or ():
+                lines.append(f"  └─ Task {task_id} depends on Task {dep_task_id}")
+
+            max_retries = subtask.get('max_retries', 0)
+            retry_info = f" (max {max_retries} retries)" if max_retries > 0 else ""
+            lines.append(f"  └─ Task {task_id}: {subtask['prompt'][:60]}...{retry_info}")
+
+        if lines:
+            print("\n".join(lines))
+        return task_ids
 
     def get_job_status(self, job_id: str) -> Dict:
         """Get current status of a job"""
@@ -517,12 +565,19 @@ class ClaudeOrchestrator:
 
         print(f"\nWaiting for job {job_id} to complete...")
         start_time = time.time()
+        last_counts = None
+        last_print = 0.0
 
         while True:
             status = self.get_job_status(job_id)
 
-            if show_progress:
-                elapsed = int(time.time() - start_time)
+            # Heartbeats and progress logs also wake the wait below; only
+            # print when the counts moved or poll_interval has passed
+            counts = (status['completed'], status['in_progress'], status['pending'], status['failed'])
+            now = time.time()
+            if show_progress and (counts != last_counts or now - last_print >= poll_interval):
+                last_counts, last_print = counts, now
+                elapsed = int(now - start_time)
                 print(f"[{elapsed}s] Progress: {status['completed']}/{status['total_tasks']} tasks "
                       f"({status['progress_pct']:.1f}%) | "
                       f"In Progress: {status['in_progress']} | "
@@ -534,11 +589,17 @@ class ClaudeOrchestrator:
                 break
 
             # Check timeout
-            if timeout and (time.time() - start_time) > timeout:
-                print(f"\nTimeout reached after {timeout}s")
-                break
-
-            time.sleep(poll_interval)
+            wait = poll_interval
+            if timeout:
+                remaining = timeout - (time.time() - start_time)
+                if remaining <= 0:
+                    print(f"\nTimeout reached after {timeout}s")
+                    break
+                wait = min(wait, remaining)
+
+            # Wakes as soon as a worker commits; poll_interval is only the
+            # longest gap between status checks
+            self.queue.wait_for_change(job_id, wait)
 
         # Collect results
         tasks = self.queue.get_job_tasks(job_id)
@@ -550,10 +611,12 @@ class ClaudeOrchestrator:
                 'task_id': task_id,
                 'prompt': task['prompt'],
                 'status': task['status'],
-                'result': json.loads(task['result']) if task['result'] else None,
+                # Results carry up to a megabyte each of CLI output; the
+                # queue's decoder uses orjson when it is installed
+                'result': TaskQueue.decode_json(task['result'] or None),
                 'error': task['error'],
                 'working_dir': task['working_dir'],
-                'expected_outputs': json.loads(task['expected_outputs']) if task['expected_outputs'] else None
+                'expected_outputs': TaskQueue.decode_json(task['expected_outputs'] or None)
             }
 
         # Mark job as complete
@@ -635,21 +698,18 @@ class ClaudeOrchestrator:
         Returns:
             List of created task IDs
         """
-        task_ids = []
-        for subtask in subtasks:
-            task_id = self.add_subtask(
-                job_id=job_id,
-                prompt=subtask['prompt'],
-                working_dir=subtask.get('working_dir'),
-                context_files=subtask.get('context_files'),
-                expected_outputs=subtask.get('expected_outputs'),
-                priority=subtask.get('priority', 0),
-                parent_task_id=parent_task_id,
-                metadata=subtask.get('metadata')
-            )
-            task_ids.append(task_id)
-
-        return task_ids
+        return self.add_subtasks(job_id, [
+            {
+                'prompt': subtask['prompt'],
+                'working_dir': subtask.get('working_dir'),
+                'context_files': subtask.get('context_files'),
+                'expected_outputs': subtask.get('expected_outputs'),
+                'priority': subtask.get('priority', 0),
+                'parent_task_id': parent_task_id,
+                'metadata': subtask.get('metadata'),
+            }
+            for subtask in subtasks
+        ])
 
     def synthesize_results(self, results: Dict[int, Dict],
                           synthesis_prompt: Optional[str] = None) -> str:
@@ -710,10 +770,13 @@ class ClaudeOrchestrator:
 
 # Convenience functions for quick usage
 def quick_delegate(tasks: List[str], orchestrator_id: str = "quick_orch",
-                   priority: int = 5) -> Dict[int, Dict]:
+                   priority: int = 5, use_cache: bool = False) -> Dict[int, Dict]:
     """
     Quick delegation for simple parallel tasks
 
+    With use_cache=True, prompts that already ran to completion return the
+    cached result instead of being executed again.
+
     Example:
         results = quick_delegate([
             "Create a factorial function in Python",
@@ -724,8 +787,9 @@ def quick_delegate(tasks: List[str], orchestrator_id: str = "quick_orch",
     orch = ClaudeOrchestrator(orchestrator_id)
     job_id = orch.create_job(f"Quick parallel execution of {len(tasks)} tasks")
 
-    for task in tasks:
-        orch.add_subtask(job_id, task, priority=priority)
+    orch.add_subtasks(job_id, [
+        {'prompt': task, 'priority': priority, 'use_cache': use_cache} for task in tasks
+    ])
 
     return orch.wait_and_collect(job_id)
 
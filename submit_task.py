@@ -61,16 +61,14 @@ def submit_from_file(queue: TaskQueue, file_path: str):
 
 def list_tasks(queue: TaskQueue, status: Optional[str] = None):
     """List all tasks"""
-    tasks = queue.get_all_tasks(status)
+    total = 0
 
-    if not tasks:
-        print("No tasks found")
-        return
+    for task in queue.iter_tasks(status):
+        if total == 0:
+            print(f"\n{'ID':<6} {'Status':<12} {'Priority':<8} {'Prompt':<50} {'Worker':<10}")
+            print("-" * 100)
+        total += 1
 
-    print(f"\n{'ID':<6} {'Status':<12} {'Priority':<8} {'Prompt':<50} {'Worker':<10}")
-    print("-" * 100)
-
-    for task in tasks:
         task_id = task['id']
         status = task['status']
         priority = task['priority']
@@ -79,7 +77,11 @@ def list_tasks(queue: TaskQueue, status: Optional[str] = None):
 
         print(f"{task_id:<6} {status:<12} {priority:<8} {prompt:<50} {worker:<10}")
 
-    print(f"\nTotal: {len(tasks)} tasks")
+    if total == 0:
+        print("No tasks found")
+        return
+
+    print(f"\nTotal: {total} tasks")
 
 def show_stats(queue: TaskQueue):
     """Show queue statistics"""
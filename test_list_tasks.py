@@ -83,6 +83,16 @@ print("=" * 60)
 filtered_tasks = queue.list_tasks(status='pending', job_id=job_id)
 print(f"Pending tasks for job '{job_id}': {len(filtered_tasks)}")
 print(f"✅ list_tasks(status='pending', job_id='{job_id}') works")
+
+assert queue.count_tasks(status='pending', job_id=job_id) == len(filtered_tasks)
+assert queue.count_tasks() == len(queue.list_tasks())
+print(f"✅ count_tasks() matches list_tasks()")
+
+try:
+    queue.list_tasks(status='bogus')
+    raise AssertionError("list_tasks accepted an unknown status")
+except ValueError:
+    print(f"✅ list_tasks(status='bogus') raises ValueError")
 print()
 
 # Test 6: list_workers()
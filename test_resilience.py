@@ -96,6 +96,7 @@ def test_pause_and_resume():
         paused = queue.get_paused_tasks()
         assert len(paused) == 1
         assert paused[0]['id'] == task_id
+        assert queue.get_paused_task_ids() == [task_id]
 
         # Resume task (worker claims paused task)
         resumed = queue.claim_task("worker_1")
@@ -267,6 +268,35 @@ def test_file_change_tracking():
 
         print("✓ File change tracking works correctly")
 
+        # Bad arguments are rejected up front
+        try:
+            queue.track_file_change(task_id, 'create', None)
+            assert False, "file_path=None should be rejected"
+        except ValueError:
+            pass
+        try:
+            queue.track_file_change(task_id, 'rename', 'src/x.ts')
+            assert False, "unknown operation should be rejected"
+        except ValueError:
+            pass
+
+        # A row that fails in the database doesn't take the batch with it,
+        # and its error surfaces from the next flush
+        import sqlite3
+        queue.track_file_change(task_id, 'create', 'src/Kept.tsx', after_content='kept')
+        queue._change_queue.put((task_id, 'create', 'src/Bad.tsx', None, None))
+        queue._change_queue.put((None, 'create', 'src/Bad.tsx', None, None))
+        try:
+            queue.flush_changes()
+            assert False, "flush_changes() should raise the write error"
+        except sqlite3.IntegrityError:
+            pass
+        queue.flush_changes()
+
+        paths = [c['file_path'] for c in queue.get_task_changes(task_id)]
+        assert 'src/Kept.tsx' in paths and paths.count('src/Bad.tsx') == 1
+        print("✓ Invalid changes rejected; write errors raised without losing the batch")
+
 
 def test_rollback():
     """Test rollback functionality"""
@@ -312,6 +342,42 @@ def test_rollback():
         print("✓ Rollback functionality works correctly")
 
 
+def test_rollback_multiple_changes():
+    """Test rollback when a task changed the same file several times"""
+    print("\n=== Test: Rollback Multiple Changes ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        queue = TaskQueue(db_path)
+
+        task_id = queue.add_task("Edit files repeatedly", priority=5)
+
+        edited = Path(tmpdir) / "edited.txt"
+        created = Path(tmpdir) / "nested" / "created.txt"
+
+        queue.track_file_changes_bulk([
+            {"task_id": task_id, "operation": "modify", "file_path": str(edited),
+             "before_content": "v1", "after_content": "v2"},
+            {"task_id": task_id, "operation": "create", "file_path": str(created),
+             "after_content": "new"},
+            {"task_id": task_id, "operation": "modify", "file_path": str(edited),
+             "before_content": "v2", "after_content": "v3"},
+        ])
+        edited.write_text("v3")
+        created.parent.mkdir()
+        created.write_text("new")
+
+        result = queue.rollback_task(task_id)
+
+        assert result['errors'] == []
+        assert result['files_restored'] == [str(edited)]
+        assert result['files_deleted'] == [str(created)]
+        assert edited.read_text() == "v1"
+        assert not created.exists()
+
+        print("✓ Rollback restores the earliest content of each file")
+
+
 def test_orchestrator_retry_api():
     """Test orchestrator retry API"""
     print("\n=== Test: Orchestrator Retry API ===")
@@ -360,6 +426,427 @@ def test_claim_task_priority():
 
         print("✓ Task claim priority works correctly (pending before paused)")
 
+        # Both claim picks seek idx_status; the unused partial index from
+        # older databases is dropped on open
+        from claude_queue import _SQL_NEXT_CLAIMABLE
+        conn = queue.get_connection()
+        plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN SELECT " + _SQL_NEXT_CLAIMABLE))
+        assert plan.count("INDEX idx_status") == 2
+        conn.execute("""
+            CREATE INDEX idx_claim ON tasks(status, priority DESC, created_at)
+            WHERE status IN ('pending', 'paused')
+        """)
+        queue.close()
+        reopened = TaskQueue(db_path)
+        assert reopened.get_connection().execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'idx_claim'"
+        ).fetchone()[0] == 0
+        reopened.close()
+        print("✓ Claim seeks idx_status; stale idx_claim dropped")
+
+
+def test_bulk_checkpoints_and_changes():
+    """Test bulk checkpoint and file change writes"""
+    print("\n=== Test: Bulk Checkpoints and Changes ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        queue = TaskQueue(db_path)
+
+        task_a = queue.add_task("Task A", priority=5)
+        task_b = queue.add_task("Task B", priority=5)
+
+        queue.save_checkpoints_bulk([
+            {"task_id": task_a, "checkpoint_data": {"phase": "a"}},
+            {"task_id": task_b, "checkpoint_data": {"phase": "b"},
+             "files_created": ["b.txt"], "completion_percentage": 40},
+        ])
+
+        assert queue.get_checkpoint(task_a)['checkpoint_data']['phase'] == "a"
+        checkpoint_b = queue.get_checkpoint(task_b)
+        assert checkpoint_b['files_created'] == ["b.txt"]
+        assert checkpoint_b['completion_percentage'] == 40
+
+        queue.track_file_changes_bulk([
+            {"task_id": task_a, "operation": "create",
+             "file_path": "a.txt", "after_content": "a"},
+            {"task_id": task_a, "operation": "modify", "file_path": "b.txt",
+             "before_content": "old", "after_content": "new"},
+        ])
+
+        changes = queue.get_task_changes(task_a)
+        assert [c['file_path'] for c in changes] == ["a.txt", "b.txt"]
+        assert changes[1]['before_content'] == "old"
+
+        # Large content is stored compressed and read back unchanged
+        big = "line of source code\n" * 500
+        queue.track_file_change(task_b, 'modify', 'big.txt',
+                                before_content=big, after_content=big + "x")
+        change = queue.get_task_changes(task_b)[0]
+        assert change['before_content'] == big
+        assert change['after_content'] == big + "x"
+
+        print("✓ Bulk checkpoint and change tracking works correctly")
+
+
+def test_job_stats_rollup():
+    """Test that job stats follow task status transitions"""
+    print("\n=== Test: Job Stats Rollup ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        queue = TaskQueue(db_path)
+
+        queue.create_job("job_1", "Rollup job", "orch_1")
+        task_a = queue.add_task("Task A", job_id="job_1")
+        queue.add_task("Task B", job_id="job_1")
+        queue.add_task("Unrelated task")
+
+        stats = queue.get_job_stats("job_1")
+        assert stats['pending'] == 2
+        assert stats['completed'] == 0
+
+        queue.register_worker("worker_1")
+        claimed = queue.claim_task("worker_1")
+        assert claimed['id'] == task_a
+        queue.complete_task(task_a, "worker_1", {"ok": True})
+
+        stats = queue.get_job_stats("job_1")
+        assert stats['pending'] == 1
+        assert stats['claimed'] == 0
+        assert stats['completed'] == 1
+
+        # A fresh TaskQueue on the same database sees the same counts
+        assert TaskQueue(db_path).get_job_stats("job_1") == stats
+
+        # The SQL-built JSON stats match the dict version
+        assert json.loads(queue.get_stats_json()) == queue.get_stats()
+
+        print("✓ Job stats rollup tracks status transitions")
+
+
+def test_async_task_queue():
+    """Test the asyncio wrapper around TaskQueue"""
+    print("\n=== Test: Async Task Queue ===")
+
+    import asyncio
+    from claude_queue import AsyncTaskQueue
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        aqueue = AsyncTaskQueue(db_path)
+
+        async def scenario():
+            task_ids = await asyncio.gather(
+                *(aqueue.add_task(f"Task {i}", priority=i) for i in range(5))
+            )
+            tasks = await asyncio.gather(*(aqueue.get_task(t) for t in task_ids))
+            return task_ids, tasks
+
+        try:
+            task_ids, tasks = asyncio.run(scenario())
+        finally:
+            aqueue.close()
+
+        assert len(set(task_ids)) == 5
+        assert [t['id'] for t in tasks] == list(task_ids)
+        # close() released the wrapper's own TaskQueue; the rows are on disk
+        reopened = TaskQueue(db_path)
+        assert len(reopened.list_tasks(status='pending')) == 5
+        reopened.close()
+
+        print("✓ Async wrapper runs queue calls off the event loop")
+
+        # A blocking wait must not hold up writes queued after it
+        aqueue = AsyncTaskQueue(os.path.join(tmpdir, "wait.db"))
+
+        async def wait_then_write():
+            aqueue.queue.create_job("job_async", "Async job", "orch_1")
+            task_id = await aqueue.add_task("Waited on", job_id="job_async")
+            waiter = asyncio.ensure_future(
+                aqueue.wait_for_job_completion("job_async", poll_interval=30, timeout=10)
+            )
+            await asyncio.sleep(0.1)
+            await aqueue.register_worker("worker_1")
+            await aqueue.claim_task("worker_1")
+            await aqueue.complete_task(task_id, "worker_1", {"ok": True})
+            assert await aqueue.count_tasks(status='completed') == 1
+            return await waiter
+
+        import time
+        started = time.time()
+        try:
+            assert asyncio.run(wait_then_write())
+        finally:
+            aqueue.close()
+        assert time.time() - started < 5
+
+        try:
+            aqueue.iter_tasks
+            assert False, "iter_* generators should not be wrapped"
+        except AttributeError:
+            pass
+
+        print("✓ Waits run beside writes; generators not wrapped")
+
+
+def test_add_tasks_bulk():
+    """Test adding several tasks in one call"""
+    print("\n=== Test: Bulk Add Tasks ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        queue = TaskQueue(db_path)
+
+        first_id = queue.add_task("Existing task")
+        task_ids = queue.add_tasks([
+            {"prompt": "Bulk A", "priority": 3, "max_retries": 2},
+            {"prompt": "Bulk B", "metadata": {"k": "v"}},
+            {"prompt": "Bulk C", "retry_policy": {"backoff": "exponential"}},
+        ])
+
+        assert task_ids == [first_id + 1, first_id + 2, first_id + 3]
+        assert queue.get_task(task_ids[0])['max_retries'] == 2
+        assert json.loads(queue.get_task(task_ids[1])['metadata']) == {"k": "v"}
+        assert json.loads(queue.get_task(task_ids[2])['retry_policy'])['backoff'] == "exponential"
+        assert queue.add_tasks([]) == []
+
+        print("✓ Bulk add returns IDs in order and stores all fields")
+
+        # Dependencies are committed with the tasks, so the dependent task
+        # is never claimable on its own
+        queue.register_worker("worker_1")
+        dep_id, = queue.add_tasks([
+            {"prompt": "Needs bulk A", "priority": 10, "depends_on": [task_ids[0]]},
+        ])
+        assert queue.get_task_dependencies(dep_id) == [task_ids[0]]
+        assert queue.claim_task("worker_1")['id'] != dep_id
+
+        # A cycle rejects the whole batch
+        try:
+            queue.add_tasks([{"prompt": "Cycle", "depends_on": [dep_id + 1]}])
+            assert False, "self-dependency should be rejected"
+        except ValueError:
+            pass
+        assert queue.count_tasks() == len(task_ids) + 2
+        print("✓ Bulk dependencies added in the same transaction")
+
+
+def test_result_cache():
+    """Test that opt-in cached tasks reuse an identical task's result"""
+    print("\n=== Test: Result Cache ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        queue = TaskQueue(db_path)
+        queue.register_worker("worker_1")
+
+        spec = {"prompt": "Write factorial", "context_files": ["b.py", "a.py"],
+                "use_result_cache": True}
+        [first] = queue.add_tasks([spec])
+        assert queue.get_task(first)['status'] == 'pending'
+        queue.claim_task("worker_1")
+        queue.complete_task(first, "worker_1", {"stdout": "done"})
+
+        # Same inputs (context file order ignored) hit; other inputs and
+        # tasks that didn't opt in still go to workers
+        hit, other, uncached = queue.add_tasks([
+            {**spec, "context_files": ["a.py", "b.py"]},
+            {**spec, "prompt": "Write fibonacci", "priority": 5},
+            {"prompt": "Write factorial", "context_files": ["a.py", "b.py"]},
+        ])
+        hit_task = queue.get_task(hit)
+        assert hit_task['status'] == 'completed'
+        assert json.loads(hit_task['result']) == {"stdout": "done"}
+        assert queue.get_task(other)['status'] == 'pending'
+        assert queue.get_task(uncached)['status'] == 'pending'
+        print("✓ Identical opted-in task completed from cache")
+
+        queue._RESULT_CACHE_SIZE = 1
+        queue.claim_task("worker_1")
+        queue.complete_task(other, "worker_1", {"stdout": "fib"})
+        [evicted] = queue.add_tasks([spec])
+        assert queue.get_task(evicted)['status'] == 'pending'
+        print("✓ Least recently used entries evicted past the size limit")
+
+        # A hit with unmet dependencies waits like any other task
+        fib = {**spec, "prompt": "Write fibonacci"}
+        blocked, = queue.add_tasks([{**fib, "depends_on": [uncached]}])
+        assert queue.get_task(blocked)['status'] == 'pending'
+        ready, = queue.add_tasks([{**fib, "depends_on": [hit]}])
+        assert queue.get_task(ready)['status'] == 'completed'
+        print("✓ Cache hits respect dependencies")
+        queue.close()
+
+
+def test_wait_for_job_completion_wakes():
+    """Test that job waiters wake as soon as the last task completes"""
+    print("\n=== Test: Job Completion Wakeup ===")
+
+    import threading
+    import time
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        queue = TaskQueue(db_path)
+
+        queue.create_job("job_wait", "Wait job", "orch_1")
+        task_id = queue.add_task("Only task", job_id="job_wait")
+        queue.register_worker("worker_1")
+        queue.claim_task("worker_1")
+
+        def finish():
+            time.sleep(0.2)
+            queue.complete_task(task_id, "worker_1", {"ok": True})
+
+        threading.Thread(target=finish).start()
+
+        started = time.time()
+        assert queue.wait_for_job_completion("job_wait", poll_interval=30, timeout=10)
+        assert time.time() - started < 5
+
+        print("✓ Waiter woke on completion without waiting for the poll interval")
+
+        # A separate TaskQueue (as in a worker process) can't notify the
+        # condition; data_version picks up its commit instead
+        other = TaskQueue(db_path)
+        task2_id = other.add_task("Other process task", job_id="job_wait")
+
+        def finish_elsewhere():
+            time.sleep(0.2)
+            other.claim_task("worker_1")
+            other.complete_task(task2_id, "worker_1", {"ok": True})
+
+        threading.Thread(target=finish_elsewhere).start()
+
+        started = time.time()
+        while queue.get_job_stats("job_wait")['completed'] < 2:
+            assert queue.wait_for_change("job_wait", 30)
+        assert time.time() - started < 5
+        assert not queue.wait_for_change("job_wait", 0.2)
+        other.close()
+
+        print("✓ Waiter woke on another connection's commit")
+
+        # Conditions are dropped once no waiter holds them
+        assert "job_wait" not in queue._job_conds
+        queue.complete_task(task_id, "worker_1", {"ok": True})
+        assert len(queue._job_conds) == 0
+        queue.close()
+
+        print("✓ Job conditions pruned after their waiters return")
+
+
+def test_failed_commit_rolls_back():
+    """Test that a failed COMMIT leaves the writer usable, not stuck mid-transaction"""
+    print("\n=== Test: Failed Commit ===")
+
+    import sqlite3
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        queue = TaskQueue(db_path)
+
+        # A deferred foreign key is only checked at COMMIT
+        with queue._writer(transaction=False) as conn:
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+            conn.execute("""
+                CREATE TABLE child (
+                    parent_id INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED
+                )
+            """)
+
+        try:
+            with queue._writer() as conn:
+                conn.execute("INSERT INTO child VALUES (42)")
+            assert False, "COMMIT should have failed"
+        except sqlite3.IntegrityError:
+            pass
+
+        assert not queue.get_connection().in_transaction
+        task_id = queue.add_task("After failed commit")
+
+        other = sqlite3.connect(db_path)
+        assert other.execute("SELECT COUNT(*) FROM tasks WHERE id = ?", (task_id,)).fetchone()[0] == 1
+        assert other.execute("SELECT COUNT(*) FROM child").fetchone()[0] == 0
+        other.close()
+        print("✓ Failed commit rolled back and later writes are committed")
+
+        # A transaction opened by a get_connection() caller is not joined
+        conn = queue.get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            queue.add_task("Inside caller transaction")
+            assert False, "add_task should not join the caller's transaction"
+        except sqlite3.OperationalError:
+            pass
+        conn.execute("ROLLBACK")
+        queue.close()
+        print("✓ Caller-opened transaction not silently joined")
+
+
+def test_cli_timeout_bounds():
+    """Test that the CLI timeout covers its stdin, background children and pipes"""
+    print("\n=== Test: CLI Timeout Bounds ===")
+
+    import subprocess
+    import time
+    from claude_worker import ClaudeWorker
+
+    if not hasattr(os, 'killpg'):
+        print("⚠ Skipped: process groups need POSIX")
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        worker = ClaudeWorker("worker_cli", db_path=os.path.join(tmpdir, "test.db"))
+        worker._CLI_TIMEOUT = 1
+        worker._READER_JOIN_TIMEOUT = 1
+        pid_file = os.path.join(tmpdir, "cli.pid")
+
+        def fake_cli(name, body):
+            path = os.path.join(tmpdir, name)
+            with open(path, "w") as f:
+                f.write(f"#!/bin/sh\necho $$ > {pid_file}\n{body}\n")
+            os.chmod(path, 0o755)
+            return path
+
+        # Never reads a prompt larger than the pipe buffer, and leaves a
+        # background child holding stdout
+        worker.claude_bin = fake_cli("stall", "sleep 30 &\nsleep 30")
+        started = time.time()
+        try:
+            worker._run_claude("x" * (1024 * 1024), tmpdir)
+            assert False, "CLI run should have timed out"
+        except subprocess.TimeoutExpired:
+            pass
+        assert time.time() - started < 5
+
+        with open(pid_file) as f:
+            pgid = int(f.read())
+        # Orphaned children are reaped by init shortly after the kill
+        for _ in range(50):
+            try:
+                os.killpg(pgid, 0)
+            except ProcessLookupError:
+                break
+            time.sleep(0.1)
+        else:
+            assert False, "CLI process group should have been killed"
+        print("✓ Timeout covers the prompt write and kills the process group")
+
+        # Exits at once, but a background child keeps its pipes open
+        worker.claude_bin = fake_cli("background", "cat > /dev/null\necho done\nsleep 30 &")
+        started = time.time()
+        return_code, stdout, _ = worker._run_claude("prompt", tmpdir)
+        assert time.time() - started < 5
+        assert return_code == 0 and stdout == "done\n"
+
+        with open(pid_file) as f:
+            os.killpg(int(f.read()), 9)
+        worker.queue.close()
+        print("✓ Leftover background process doesn't hold up the worker")
+
 
 def run_all_tests():
     """Run all tests"""
@@ -369,12 +856,21 @@ def run_all_tests():
 
     tests = [
         test_checkpoint_save_and_get,
+        test_add_tasks_bulk,
+        test_result_cache,
         test_pause_and_resume,
         test_retry_with_error_context,
         test_auto_retry_on_failure,
         test_max_retries_exceeded,
         test_file_change_tracking,
+        test_bulk_checkpoints_and_changes,
+        test_job_stats_rollup,
+        test_wait_for_job_completion_wakes,
+        test_async_task_queue,
         test_rollback,
+        test_failed_commit_rolls_back,
+        test_cli_timeout_bounds,
+        test_rollback_multiple_changes,
         test_orchestrator_retry_api,
         test_claim_task_priority,
     ]
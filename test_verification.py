@@ -158,6 +158,24 @@ def test_expected_outputs_verification():
         assert status["output1.txt"], "output1.txt should exist"
         assert not status["missing.txt"], "missing.txt should not exist"
 
+        # Test 3: Several files in one directory (checked with one listing)
+        (tmppath / "subdir" / "output3.txt").write_text("content")
+        expected_same_dir = ["subdir/output2.txt", "subdir/output3.txt", "subdir/missing.txt"]
+        all_exist, status = verifier.check_expected_outputs(expected_same_dir)
+
+        assert not all_exist, "Should detect missing file in shared directory"
+        assert status == {
+            "subdir/output2.txt": True,
+            "subdir/output3.txt": True,
+            "subdir/missing.txt": False,
+        }
+
+        # A name that differs from the listing only in case gets the same
+        # answer as a per-file exists() (True on case-insensitive filesystems)
+        expected_case = ["subdir/OUTPUT2.txt", "subdir/output3.txt"]
+        _, status = verifier.check_expected_outputs(expected_case)
+        assert status == {f: (tmppath / f).exists() for f in expected_case}
+
     print("✓ Expected outputs verification test passed\n")
 
 
@@ -128,6 +128,22 @@ def test_task_dependencies_basic():
 
         print("✓ Task dependencies work correctly")
 
+        # Pre-encoded results (bytes or str) are stored as-is
+        task3 = queue.claim_task(worker_id)
+        assert task3 is not None and task3['id'] == task3_id
+        queue.complete_task(task3_id, worker_id, b'{"result":"done"}')
+        assert json.loads(queue.get_task(task3_id)['result']) == {"result": "done"}
+        assert json.loads(queue.get_task(task2_id)['result']) == {"result": "done"}
+        assert TaskQueue.decode_json(queue.get_task(task3_id)['result']) == {"result": "done"}
+        assert TaskQueue.decode_json(None) is None
+
+        str_task_id = queue.add_task("Task 4")
+        queue.claim_task(worker_id)
+        queue.complete_task(str_task_id, worker_id, '{"result":"done"}')
+        assert json.loads(queue.get_task(str_task_id)['result']) == {"result": "done"}
+
+        print("✓ Pre-encoded results stored as-is")
+
 
 def test_circular_dependency_detection():
     """Test circular dependency detection"""
@@ -209,6 +225,52 @@ def test_claim_task_respects_dependencies():
         print("✓ Task claiming respects dependencies correctly")
 
 
+def test_get_ready_pending_tasks():
+    """Test that get_ready_pending_tasks() filters out blocked tasks"""
+    print("\n=== Test: Ready Pending Tasks ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        queue = TaskQueue(db_path)
+
+        task1_id = queue.add_task("Task 1", priority=1)
+        task2_id = queue.add_task("Task 2 (depends on 1)", priority=9)
+        task3_id = queue.add_task("Task 3", priority=5)
+        queue.add_task_dependency(task2_id, task1_id)
+
+        ready = [t['id'] for t in queue.get_ready_pending_tasks()]
+        assert ready == [task3_id, task1_id]
+        print("✓ Blocked task excluded, ready tasks in priority order")
+
+        assert len(queue.get_ready_pending_tasks(limit=1)) == 1
+        print("✓ Limit respected")
+
+
+def test_claim_and_start_task():
+    """Test that claim_and_start_task() claims like claim_task() and starts the task"""
+    print("\n=== Test: Claim and Start Task ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        queue = TaskQueue(db_path)
+        worker_id = "worker_1"
+        queue.register_worker(worker_id)
+
+        task1_id = queue.add_task("Task 1", priority=1)
+        task2_id = queue.add_task("Task 2 (depends on 1)", priority=9)
+        queue.add_task_dependency(task2_id, task1_id)
+
+        task = queue.claim_and_start_task(worker_id)
+        assert task['id'] == task1_id
+        assert task['status'] == 'in_progress'
+        assert task['worker_id'] == worker_id
+        assert task['claimed_at'] and task['started_at']
+        print("✓ Ready task claimed and marked in progress")
+
+        assert queue.claim_and_start_task(worker_id) is None
+        print("✓ Blocked task not claimed")
+
+
 def test_orchestrator_dependencies():
     """Test orchestrator dependency API"""
     print("\n=== Test: Orchestrator Dependency API ===")
@@ -236,6 +298,37 @@ def test_orchestrator_dependencies():
         print("✓ Orchestrator dependency API works correctly")
 
 
+def test_orchestrator_add_subtasks():
+    """Test batch sub-task submission through the orchestrator"""
+    print("\n=== Test: Orchestrator Batch Sub-tasks ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        orch = ClaudeOrchestrator("test_orch", db_path=db_path)
+        job_id = orch.create_job("Batch job")
+
+        base = orch.add_subtask(job_id, "Build module", priority=10)
+        task_ids = orch.add_subtasks(job_id, [
+            {"prompt": "Test module", "depends_on": [base], "max_retries": 2},
+            {"prompt": "Document module", "parent_task_id": base, "auto_verify": False},
+        ])
+
+        assert task_ids == [base + 1, base + 2]
+        assert orch.queue.get_task_dependencies(task_ids[0]) == [base]
+
+        test_task = orch.queue.get_task(task_ids[0])
+        assert test_task['job_id'] == job_id
+        assert test_task['priority'] == orch.config.defaults.priority
+        assert test_task['max_retries'] == 2
+
+        doc_task = orch.queue.get_task(task_ids[1])
+        assert doc_task['parent_task_id'] == base
+        assert json.loads(doc_task['metadata']) == {"auto_verify": False}
+
+        assert orch.add_subtasks(job_id, []) == []
+        print("✓ Batch sub-tasks stored with dependencies, parents and metadata")
+
+
 def test_orchestrator_shared_context():
     """Test orchestrator shared context API"""
     print("\n=== Test: Orchestrator Shared Context API ===")
@@ -356,7 +449,10 @@ def run_all_tests():
         test_task_dependencies_basic,
         test_circular_dependency_detection,
         test_claim_task_respects_dependencies,
+        test_get_ready_pending_tasks,
+        test_claim_and_start_task,
         test_orchestrator_dependencies,
+        test_orchestrator_add_subtasks,
         test_orchestrator_shared_context,
         test_worker_context_injection,
         test_shared_context_update,
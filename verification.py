@@ -320,9 +320,22 @@ class TaskVerifier:
         file_status = {}
         all_exist = True
 
+        # Group by directory: one scandir() answers every file expected in
+        # that directory, instead of one stat() per file
+        by_dir: Dict[Path, List[str]] = {}
         for expected_file in expected_outputs:
             file_path = Path(self.working_dir) / expected_file
-            exists = file_path.exists()
+            by_dir.setdefault(file_path.parent, []).append(expected_file)
+
+        present = set()
+        for directory, files in by_dir.items():
+            if len(files) > 1:
+                present.update(self._present_in_dir(directory, files))
+            elif (Path(self.working_dir) / files[0]).exists():
+                present.add(files[0])
+
+        for expected_file in expected_outputs:
+            exists = expected_file in present
             file_status[expected_file] = exists
 
             if exists:
@@ -333,6 +346,33 @@ class TaskVerifier:
 
         return all_exist, file_status
 
+    def _present_in_dir(self, directory: Path, expected_files: List[str]) -> List[str]:
+        """
+        Return which of expected_files (all in directory) exist, with one listing
+
+        Names found in the listing skip the stat. Names that aren't are
+        confirmed with exists(), which follows the filesystem's case and
+        Unicode normalization rules (e.g. case-insensitive APFS on macOS),
+        so the result always matches a per-file exists() check.
+        """
+        try:
+            with os.scandir(directory) as entries:
+                names = {
+                    entry.name for entry in entries
+                    # Path.exists() is False for broken symlinks
+                    if not entry.is_symlink() or os.path.exists(entry.path)
+                }
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+        except OSError:
+            # e.g. permission denied listing the directory; stat each file
+            return [f for f in expected_files if (Path(self.working_dir) / f).exists()]
+
+        return [
+            f for f in expected_files
+            if (Path(self.working_dir) / f).name in names or (Path(self.working_dir) / f).exists()
+        ]
+
 
 def format_verification_error(results: List[VerificationResult], missing_files: Optional[List[str]] = None) -> str:
     """
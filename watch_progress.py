@@ -11,7 +11,7 @@ import time
 import argparse
 from pathlib import Path
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Add current directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
@@ -49,7 +49,10 @@ class ProgressWatcher:
             return "N/A"
         try:
             dt = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            now = datetime.now(dt.tzinfo) if dt.tzinfo else datetime.now()
+            if not dt.tzinfo:
+                # The queue stores SQLite CURRENT_TIMESTAMP values (UTC)
+                dt = dt.replace(tzinfo=timezone.utc)
+            now = datetime.now(timezone.utc)
             delta = now - dt
             seconds = int(delta.total_seconds())
 
@@ -101,11 +104,11 @@ class ProgressWatcher:
                 print(f"  {status_icon} {worker['worker_id']:<15}", end=" ")
 
                 if worker['current_task_id']:
-                    task_preview = worker['task_prompt'][:40] + "..." if worker['task_prompt'] and len(worker['task_prompt']) > 40 else (worker['task_prompt'] or "N/A")
+                    task_preview = worker['current_task_prompt'][:40] + "..." if worker['current_task_prompt'] and len(worker['current_task_prompt']) > 40 else (worker['current_task_prompt'] or "N/A")
                     print(f"Task {worker['current_task_id']}: {task_preview}")
 
-                    if worker['recent_log']:
-                        log_preview = worker['recent_log'][:50] + "..." if len(worker['recent_log']) > 50 else worker['recent_log']
+                    if worker['last_message']:
+                        log_preview = worker['last_message'][:50] + "..." if len(worker['last_message']) > 50 else worker['last_message']
                         print(f"  {'':>17} └─ {log_preview}")
                 else:
                     print("Idle")